@@ -14,8 +14,20 @@ class AnalyticsDashboard {
     
     async loadData() {
         try {
-            const response = await fetch('/api/analytics/summary/');
-            this.data = await response.json();
+            const response = await fetch('/api/analytics/trends/');
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            const trends = await response.json();
+            this.data = {
+                labels: trends.labels,
+                total_track_plays: trends.totals.plays,
+                total_chat_sessions: trends.totals.chats,
+                total_merch_views: trends.totals.views,
+                total_event_rsvps: 0,
+                track_plays_trend: trends.series.plays,
+                chat_sessions_trend: trends.series.chats,
+                popular_genres: trends.popular_genres,
+                engagement_by_day: trends.engagement_by_day
+            };
         } catch (error) {
             console.error('Failed to load analytics data:', error);
             this.data = this.getDefaultData();
@@ -62,7 +74,7 @@ class AnalyticsDashboard {
         this.charts.trackPlays = new Chart(ctx, {
             type: 'line',
             data: {
-                labels: ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+                labels: this.data.labels || ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
                 datasets: [{
                     label: 'Track Plays',
                     data: this.data.track_plays_trend,
@@ -236,7 +248,7 @@ class AnalyticsDashboard {
         this.charts.chatSessions = new Chart(ctx, {
             type: 'line',
             data: {
-                labels: ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
+                labels: this.data.labels || ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'],
                 datasets: [{
                     label: 'WhizBot Sessions',
                     data: this.data.chat_sessions_trend,
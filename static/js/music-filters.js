@@ -89,7 +89,8 @@ class MusicFilters {
             
             // Tempo filter
             if (this.activeFilters.tempo !== 'all') {
-                const bpm = track.bpm || 0;
+                // Prefer the tempo measured from the audio over the hand-entered BPM.
+                const bpm = track.tempo || track.bpm || 0;
                 switch (this.activeFilters.tempo) {
                     case 'slow':
                         if (bpm >= 100) return false;
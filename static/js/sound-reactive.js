@@ -215,10 +215,20 @@ class WaveformGenerator {
         this.waveforms = new Map();
     }
     
-    async generateWaveform(audioUrl, containerId) {
+    async generateWaveform(audioUrl, containerId, trackId = null) {
         const container = document.getElementById(containerId);
         if (!container) return;
         
+        if (trackId) {
+            try {
+                const peaks = await this.loadPeaks(trackId, container.offsetWidth);
+                this.drawPeaks(peaks, container);
+                return;
+            } catch (error) {
+                // No server-side peaks yet; decode the audio in the browser instead.
+            }
+        }
+        
         try {
             const audioContext = new (window.AudioContext || window.webkitAudioContext)();
             const response = await fetch(audioUrl);
@@ -232,6 +242,66 @@ class WaveformGenerator {
         }
     }
     
+    async loadPeaks(trackId, width) {
+        // audiowaveform .dat v1: int32 version, uint32 flags, int32 rate,
+        // int32 samples per pixel, uint32 length, then (min, max) pairs.
+        const response = await fetch(`/api/tracks/${trackId}/peaks/?points=${width}&bits=8`);
+        if (!response.ok) throw new Error(`No peaks for track ${trackId}`);
+        
+        const buffer = await response.arrayBuffer();
+        const header = new DataView(buffer, 0, 20);
+        const eightBit = (header.getUint32(4, true) & 1) === 1;
+        const length = header.getUint32(16, true);
+        const pairs = eightBit ? new Int8Array(buffer, 20, length * 2) : new Int16Array(buffer, 20, length * 2);
+        const scale = eightBit ? 128 : 32768;
+        
+        const mins = new Float32Array(length);
+        const maxs = new Float32Array(length);
+        for (let i = 0; i < length; i++) {
+            mins[i] = pairs[2 * i] / scale;
+            maxs[i] = pairs[2 * i + 1] / scale;
+        }
+        return { mins, maxs };
+    }
+    
+    drawPeaks(peaks, container) {
+        const canvas = document.createElement('canvas');
+        canvas.width = container.offsetWidth;
+        canvas.height = container.offsetHeight;
+        container.appendChild(canvas);
+        
+        const ctx = canvas.getContext('2d');
+        const amp = canvas.height / 2;
+        const ratio = peaks.mins.length / canvas.width;
+        
+        ctx.fillStyle = '#0C0C0C';
+        ctx.fillRect(0, 0, canvas.width, canvas.height);
+        
+        const gradient = ctx.createLinearGradient(0, 0, canvas.width, 0);
+        gradient.addColorStop(0, '#00E0FF');
+        gradient.addColorStop(1, '#7A00FF');
+        
+        ctx.strokeStyle = gradient;
+        ctx.lineWidth = 2;
+        ctx.beginPath();
+        
+        for (let i = 0; i < canvas.width; i++) {
+            const start = Math.floor(i * ratio);
+            const end = Math.max(start + 1, Math.floor((i + 1) * ratio));
+            let min = 1;
+            let max = -1;
+            for (let j = start; j < end && j < peaks.mins.length; j++) {
+                if (peaks.mins[j] < min) min = peaks.mins[j];
+                if (peaks.maxs[j] > max) max = peaks.maxs[j];
+            }
+            
+            ctx.moveTo(i, (1 + min) * amp);
+            ctx.lineTo(i, (1 + max) * amp);
+        }
+        
+        ctx.stroke();
+    }
+    
     drawWaveform(audioBuffer, container) {
         const canvas = document.createElement('canvas');
         canvas.width = container.offsetWidth;
@@ -255,8 +325,13 @@ class WaveformGenerator {
         ctx.beginPath();
         
         for (let i = 0; i < canvas.width; i++) {
-            const min = Math.min(...data.slice(i * step, (i + 1) * step));
-            const max = Math.max(...data.slice(i * step, (i + 1) * step));
+            let min = 1;
+            let max = -1;
+            const end = Math.min((i + 1) * step, data.length);
+            for (let j = i * step; j < end; j++) {
+                if (data[j] < min) min = data[j];
+                if (data[j] > max) max = data[j];
+            }
             
             ctx.moveTo(i, (1 + min) * amp);
             ctx.lineTo(i, (1 + max) * amp);
@@ -5,6 +5,7 @@ class WhizBot {
         this.messages = [];
         this.sessionId = this.generateSessionId();
         this.apiEndpoint = '/api/chat/';
+        this.streamEndpoint = '/api/chat/stream/';
         this.isTyping = false;
         
         this.init();
@@ -485,7 +486,16 @@ class WhizBot {
         // Scroll to bottom
         messagesContainer.scrollTop = messagesContainer.scrollHeight;
         
-        this.messages.push({ text, sender, timestamp: new Date() });
+        const entry = { text, sender, timestamp: new Date() };
+        this.messages.push(entry);
+        return { contentDiv, entry };
+    }
+    
+    appendToMessage(message, text) {
+        const messagesContainer = document.getElementById('whizbot-messages');
+        message.entry.text += text;
+        message.contentDiv.textContent = message.entry.text;
+        messagesContainer.scrollTop = messagesContainer.scrollHeight;
     }
     
     showTyping() {
@@ -510,12 +520,23 @@ class WhizBot {
         this.showTyping();
         this.isTyping = true;
         
+        let reply = null;
+        const showReply = (text) => {
+            if (reply) {
+                this.appendToMessage(reply, text);
+            } else {
+                this.hideTyping();
+                reply = this.addMessage(text, 'bot');
+            }
+        };
+        
         try {
-            // Send to backend
-            const response = await fetch(this.apiEndpoint, {
+            // Stream the answer; each token is shown as soon as it arrives
+            const response = await fetch(this.streamEndpoint, {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json',
+                    'Accept': 'text/event-stream',
                     'X-CSRFToken': this.getCookie('csrftoken')
                 },
                 body: JSON.stringify({
@@ -523,23 +544,50 @@ class WhizBot {
                     session_id: this.sessionId
                 })
             });
-            
-            const data = await response.json();
-            
-            // Simulate natural typing delay
-            setTimeout(() => {
-                this.hideTyping();
-                this.isTyping = false;
-                this.addMessage(data.response || this.getDefaultResponse(message), 'bot');
-            }, 1000);
-            
+            if (!response.ok || !response.body) throw new Error(`HTTP ${response.status}`);
+            
+            await this.readEvents(response.body, (event, data) => {
+                if (event === 'token') {
+                    showReply(data.text);
+                } else if (event === 'error') {
+                    if (reply) {
+                        reply.entry.text = '';
+                        this.appendToMessage(reply, data.text);
+                    } else {
+                        showReply(data.text);
+                    }
+                }
+            });
+            if (!reply) showReply(this.getDefaultResponse(message));
         } catch (error) {
             console.error('WhizBot error:', error);
-            setTimeout(() => {
-                this.hideTyping();
-                this.isTyping = false;
-                this.addMessage(this.getDefaultResponse(message), 'bot');
-            }, 1000);
+            if (!reply) showReply(this.getDefaultResponse(message));
+        } finally {
+            this.hideTyping();
+            this.isTyping = false;
+        }
+    }
+    
+    async readEvents(body, onEvent) {
+        const reader = body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        for (;;) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const frame = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                let event = 'message';
+                let data = '';
+                frame.split('\n').forEach(line => {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                });
+                if (data) onEvent(event, JSON.parse(data));
+            }
         }
     }
     
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class AiConnectorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'whizzyverse.ai_connector'
+
+    def ready(self):
+        from whizzyverse.ai_connector import retrieval
+        retrieval.connect_signals()
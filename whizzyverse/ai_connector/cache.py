@@ -0,0 +1,129 @@
+"""
+In-process cache of WhizBot answers.
+
+Questions are normalised (case, punctuation and stopwords dropped) before
+lookup, so "When is the next event?" and "when's the next event" share an
+answer. A question with no exact match may reuse the answer of a cached
+question whose token set is nearly the same (Jaccard similarity of at least
+``SIMILARITY``). Entries expire after ``TTL`` seconds and the least recently
+used are evicted beyond ``MAX_ENTRIES``. The whole cache is dropped when the
+persona file or the track, event or merch catalog changes, since answers
+depend on both.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from whizzyverse.core.catalog import CATALOG_MODELS, catalog_version
+from .persona import persona_mtime
+
+WORD_RE = re.compile(r"[^\W_]+(?:'[^\W_]+)?")
+
+STOPWORDS = frozenset('''
+    a about an and any are as at be can could did do does for from get got have hey hi i i'm is it it's
+    in me my of on or please so tell that the there these this to u us was will with would yo you your
+'''.split())
+
+# Kept, since they change what is asked ("when" vs "where"); contractions fold to the bare word.
+QUESTION_WORDS = frozenset('how what when where which who why'.split())
+CONTRACTIONS = {
+    "how's": 'how', "what's": 'what', 'whats': 'what', "when's": 'when',
+    "where's": 'where', "who's": 'who', "why's": 'why',
+}
+
+DEFAULTS = {
+    'MAX_ENTRIES': 512,
+    'TTL': 3600,
+    'SIMILARITY': 0.8,
+    # Longer questions are too specific to be worth caching.
+    'MAX_QUESTION_LENGTH': 300,
+}
+
+
+def normalize(question):
+    """The question's content words, lower-cased, in order."""
+    words = WORD_RE.findall(question.lower().replace('’', "'"))
+    words = (CONTRACTIONS.get(word, word) for word in words)
+    return tuple(word for word in words if word not in STOPWORDS)
+
+
+def similarity(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+class ResponseCache:
+    def __init__(self):
+        options = {**DEFAULTS, **getattr(settings, 'WHIZBOT_RESPONSE_CACHE', {})}
+        self.max_entries = options['MAX_ENTRIES']
+        self.ttl = options['TTL']
+        self.similarity = options['SIMILARITY']
+        self.max_question_length = options['MAX_QUESTION_LENGTH']
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._version = None
+
+    def _key(self, question):
+        if len(question) > self.max_question_length:
+            return None
+        words = normalize(question)
+        return ' '.join(words) if words else None
+
+    def _check_version(self):
+        from django.apps import apps
+        version = (persona_mtime(), *(catalog_version(apps.get_model(label)) for label in CATALOG_MODELS))
+        if version != self._version:
+            self._entries.clear()
+            self._version = version
+
+    def get(self, question):
+        key = self._key(question)
+        if key is None or not self.max_entries:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            self._check_version()
+            if key not in self._entries and self.similarity < 1:
+                key = self._nearest(frozenset(key.split()), now)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, answer = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return answer
+
+    def _nearest(self, words, now):
+        """The key of the live entry most similar to ``words``, if any is similar enough."""
+        best, best_score = None, self.similarity
+        for key, (expires_at, entry_words, _) in self._entries.items():
+            if expires_at <= now:
+                continue
+            score = similarity(words, entry_words)
+            if score >= best_score:
+                best, best_score = key, score
+        return best
+
+    def set(self, question, answer):
+        key = self._key(question)
+        if key is None or not self.max_entries:
+            return
+        with self._lock:
+            self._check_version()
+            self._entries[key] = (time.monotonic() + self.ttl, frozenset(key.split()), answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,131 @@
+"""
+Guarded access to the chat completion API.
+
+Each event loop (one per ASGI worker) keeps a single ``AsyncOpenAI`` client,
+so connections are pooled and reused across requests, and a semaphore that
+caps the calls in flight. A request waits at most ``QUEUE_TIMEOUT`` seconds
+for a slot and each call is cut off after ``DEADLINE`` seconds. A process-wide
+circuit breaker opens after ``FAILURE_THRESHOLD`` consecutive failures; while
+it is open, calls fail immediately with ``Unavailable`` until ``COOLDOWN``
+seconds have passed and a single trial call succeeds.
+"""
+import asyncio
+import logging
+import threading
+import time
+import weakref
+
+from django.conf import settings
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MAX_CONCURRENT': 8,
+    'QUEUE_TIMEOUT': 2.0,
+    'DEADLINE': 30.0,
+    'FAILURE_THRESHOLD': 5,
+    'COOLDOWN': 30.0,
+}
+
+
+def option(name):
+    return getattr(settings, 'WHIZBOT_LLM', {}).get(name, DEFAULTS[name])
+
+
+class Unavailable(Exception):
+    """The completion API cannot be called right now."""
+
+
+class CircuitBreaker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < option('COOLDOWN'):
+                return False
+            self._trial = True  # half-open: let one call through
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= option('FAILURE_THRESHOLD'):
+                if self._opened_at is None or self._trial:
+                    logger.warning('Chat completions failing; answering offline for %ss', option('COOLDOWN'))
+                self._opened_at = time.monotonic()
+                self._trial = False
+
+    def abandon(self):
+        """Forget a trial call that ended without a verdict (queued out or cancelled)."""
+        with self._lock:
+            self._trial = False
+
+
+breaker = CircuitBreaker()
+
+
+class _LoopResources:
+    def __init__(self):
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, timeout=option('DEADLINE'), max_retries=0)
+        self.semaphore = asyncio.Semaphore(option('MAX_CONCURRENT'))
+
+
+_resources = weakref.WeakKeyDictionary()
+
+
+def _loop_resources():
+    loop = asyncio.get_running_loop()
+    resources = _resources.get(loop)
+    if resources is None:
+        resources = _resources[loop] = _LoopResources()
+    return resources
+
+
+async def stream_completion(options):
+    """Yield the text chunks of a streamed completion. Raises ``Unavailable`` before the first chunk."""
+    if not breaker.allow():
+        raise Unavailable('circuit open')
+    resources = _loop_resources()
+    try:
+        async with asyncio.timeout(option('QUEUE_TIMEOUT')):
+            await resources.semaphore.acquire()
+    except TimeoutError:
+        breaker.abandon()
+        raise Unavailable('too many chats in flight') from None
+
+    finished = False
+    try:
+        async with asyncio.timeout(option('DEADLINE')):
+            stream = await resources.client.chat.completions.create(**options, stream=True)
+            async for chunk in stream:
+                text = chunk.choices[0].delta.content if chunk.choices else None
+                if text:
+                    yield text
+        finished = True
+    except Exception:
+        breaker.record_failure()
+        raise
+    finally:
+        resources.semaphore.release()
+        if finished:
+            breaker.record_success()
+        else:
+            breaker.abandon()
+
+
+async def complete(options):
+    """Return the full text of a completion."""
+    return ''.join([text async for text in stream_completion(options)])
@@ -0,0 +1,115 @@
+"""
+Per-session WhizBot conversation memory.
+
+Each chat session keeps its last ``MAX_TURNS`` question and answer pairs in
+process memory. Sessions idle for ``IDLE_TIMEOUT`` seconds are dropped, and
+beyond ``MAX_SESSIONS`` the least recently active go first, so memory stays
+bounded. ``build_messages`` puts as many recent turns in the prompt as fit in
+``HISTORY_TOKENS`` and condenses older questions into one short note, so the
+prompt size is capped however long the conversation runs.
+"""
+import threading
+import time
+from collections import OrderedDict, deque
+
+from django.conf import settings
+
+DEFAULTS = {
+    'MAX_SESSIONS': 1000,
+    'MAX_TURNS': 12,
+    'IDLE_TIMEOUT': 1800,
+    'HISTORY_TOKENS': 1200,
+}
+MAX_SESSION_ID_LENGTH = 100
+SUMMARY_TOKENS = 120
+SUMMARY_QUESTION_CHARS = 80
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+class ConversationStore:
+    def __init__(self):
+        options = {**DEFAULTS, **getattr(settings, 'WHIZBOT_MEMORY', {})}
+        self.max_sessions = options['MAX_SESSIONS']
+        self.max_turns = options['MAX_TURNS']
+        self.idle_timeout = options['IDLE_TIMEOUT']
+        self.history_tokens = options['HISTORY_TOKENS']
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+
+    def history(self, session_id):
+        """The session's ``(question, answer)`` turns, oldest first."""
+        if not session_id:
+            return []
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            session = self._sessions.get(session_id)
+            return list(session[1]) if session else []
+
+    def append(self, session_id, question, answer):
+        if not session_id or len(session_id) > MAX_SESSION_ID_LENGTH:
+            return
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            turns = session[1] if session else deque(maxlen=self.max_turns)
+            turns.append((question, answer))
+            self._sessions[session_id] = (now, turns)
+            self._evict(now)
+
+    def _evict(self, now):
+        while self._sessions:
+            session_id, (last_active, _) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= self.max_sessions and now - last_active < self.idle_timeout:
+                break
+            del self._sessions[session_id]
+
+
+conversations = ConversationStore()
+
+
+def build_messages(system_prompt, history, user_message, context=None, budget=None):
+    """
+    Chat messages for ``user_message`` with as much of ``history`` as fits in
+    ``budget`` tokens, and an optional ``context`` system message.
+    """
+    budget = conversations.history_tokens if budget is None else budget
+    kept, used = [], 0
+    for position in range(len(history) - 1, -1, -1):
+        question, answer = history[position]
+        cost = estimate_tokens(question) + estimate_tokens(answer)
+        if used + cost > budget:
+            break
+        kept.append((question, answer))
+        used += cost
+    dropped = history[:len(history) - len(kept)]
+
+    messages = [{'role': 'system', 'content': system_prompt}]
+    if context:
+        messages.append({'role': 'system', 'content': context})
+    if dropped:
+        messages.append({'role': 'system', 'content': summarize(dropped)})
+    for question, answer in reversed(kept):
+        messages.append({'role': 'user', 'content': question})
+        messages.append({'role': 'assistant', 'content': answer})
+    messages.append({'role': 'user', 'content': user_message})
+    return messages
+
+
+def summarize(turns):
+    """A short note listing the most recent of the fan's earlier questions."""
+    questions, used = [], 0
+    for question, _ in reversed(turns):
+        question = ' '.join(question.split())
+        if len(question) > SUMMARY_QUESTION_CHARS:
+            question = question[:SUMMARY_QUESTION_CHARS - 1] + '…'
+        used += estimate_tokens(question)
+        if used > SUMMARY_TOKENS:
+            break
+        questions.append(question)
+    questions.reverse()
+    return 'Earlier in this chat the fan asked: ' + '; '.join(questions)
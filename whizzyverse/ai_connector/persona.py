@@ -0,0 +1,38 @@
+import json
+import os
+import threading
+
+from django.conf import settings
+
+_cache = (None, None)
+_lock = threading.Lock()
+
+
+def persona_path():
+    return os.path.join(settings.BASE_DIR, 'seed', 'whizzy_persona.json')
+
+
+def persona_mtime():
+    try:
+        return os.stat(persona_path()).st_mtime_ns
+    except OSError:
+        return None
+
+
+def load_whizzy_persona():
+    """The parsed persona file, re-read only when its mtime changes."""
+    global _cache
+    mtime = persona_mtime()
+    if mtime is None:
+        return None
+    cached_mtime, persona = _cache
+    if cached_mtime == mtime:
+        return persona
+    with _lock:
+        try:
+            with open(persona_path(), 'r') as f:
+                persona = json.load(f)
+        except FileNotFoundError:
+            return None
+        _cache = (mtime, persona)
+        return persona
@@ -0,0 +1,283 @@
+"""
+Catalog facts retrieved for WhizBot prompts.
+
+Every track, event and merch item is written out as one short fact and
+embedded as a hashed bag of words: content words (see ``cache.normalize``)
+and word pairs are hashed into ``DIMENSIONS`` buckets and weighted by TF-IDF.
+The matrix is kept sparse, as parallel NumPy arrays of row, bucket and
+weight. A question is embedded the same way and the facts with the highest
+cosine similarity are added to the prompt, so answers reflect the live
+catalog and only the few relevant facts are sent.
+
+Saved and deleted rows are reported by signals; only those facts are
+re-embedded before the next query, and the weights are recomputed from the
+stored term frequencies. A full rebuild happens when another worker changed
+the catalog or every ``REBUILD_INTERVAL`` seconds, which also relabels events
+that have since passed. It runs outside the index lock, and other chats keep
+searching the old facts until the new index is swapped in.
+"""
+import math
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+from django.utils import dateformat, timezone
+
+from whizzyverse.core.catalog import CATALOG_MODELS, catalog_version
+from .cache import QUESTION_WORDS, normalize
+
+DIMENSIONS = 1 << 20
+TOP_FACTS = 4
+MIN_SCORE = 0.1
+REBUILD_INTERVAL = 3600
+
+URL_RE = re.compile(r'https?://\S+')
+
+
+def _bucket(feature):
+    return zlib.crc32(feature.encode()) & (DIMENSIONS - 1)
+
+
+def _stem(word):
+    # Plural folding is enough for catalog wording ("shows", "tracks", "hoodies").
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+
+def term_frequencies(text):
+    """Sublinear term frequencies of ``text``'s words and word pairs, as sorted buckets and values."""
+    words = [_stem(word) for word in normalize(URL_RE.sub(' ', text)) if word not in QUESTION_WORDS]
+    counts = {}
+    for feature in (*words, *(f'{a} {b}' for a, b in zip(words, words[1:]))):
+        bucket = _bucket(feature)
+        counts[bucket] = counts.get(bucket, 0) + 1
+    buckets = np.array(sorted(counts), dtype=np.int64)
+    values = np.array([1 + math.log(counts[bucket]) for bucket in buckets.tolist()], dtype=np.float32)
+    return buckets, values
+
+
+def _money(value):
+    return f'${value:,.2f}' if value is not None else None
+
+
+def track_fact(track):
+    details = [track.genre]
+    if track.bpm:
+        details.append(f'{track.bpm} BPM')
+    if track.duration:
+        details.append(track.duration)
+    if track.mood:
+        details.append(f'{track.get_mood_display().lower()} mood')
+    released = f", released {dateformat.format(track.release_date, 'F j, Y')}" if track.release_date else ''
+    return f"Track '{track.title}' by {track.artist}: {', '.join(details)}{released}; {track.plays:,} plays."
+
+
+def event_fact(event, now):
+    when = timezone.localtime(event.date)
+    status = 'Upcoming' if event.date >= now else 'Past'
+    fact = (
+        f"{status} event (live show) '{event.name}' on {dateformat.format(when, 'l, F j, Y, g:i A')} "
+        f"at {event.venue}, {event.city}, {event.country}."
+    )
+    if event.ticket_price is not None:
+        fact += f' Tickets {_money(event.ticket_price)}.'
+    if event.capacity:
+        fact += f' Capacity {event.capacity:,}.'
+    if event.ticket_url:
+        fact += f' Tickets: {event.ticket_url}'
+    return fact
+
+
+def merch_fact(item):
+    stock = 'in stock' if item.is_available and item.in_stock else 'sold out'
+    description = ' '.join(item.description.split())
+    if len(description) > 160:
+        description = description[:159] + '…'
+    return f"Merch '{item.name}' ({item.get_category_display()}): {_money(item.price)}, {stock}. {description}"
+
+
+FACTS = {
+    'tracks.Track': lambda instance, now: track_fact(instance),
+    'events.Event': event_fact,
+    'merch.MerchItem': lambda instance, now: merch_fact(instance),
+}
+
+
+class CatalogIndex:
+    # The index contents, replaced as a whole by a full rebuild.
+    INDEX = ['_keys', '_rows', '_facts', '_terms', '_matrix', '_versions', '_built_at']
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Held for the whole of a full rebuild, so only one runs at a time.
+        self._rebuild_lock = threading.Lock()
+        self._changed = set()
+        self._reset()
+
+    def _reset(self):
+        self._keys = []
+        self._rows = {}
+        self._facts = []
+        self._terms = []
+        self._matrix = None
+        self._versions = None
+        self._built_at = 0.0
+
+    def mark_changed(self, label, pk):
+        with self._lock:
+            self._changed.add((label, pk))
+
+    def search(self, text, limit=TOP_FACTS):
+        """The facts most relevant to ``text``, best first."""
+        buckets, values = term_frequencies(text)
+        if not len(buckets):
+            return []
+        with self._lock:
+            rebuild = self._refresh()
+        if rebuild:
+            self._rebuild()
+        elif self._versions is None:
+            # The first build is running in another chat; wait for it.
+            with self._rebuild_lock:
+                pass
+        with self._lock:
+            if not self._facts:
+                return []
+            if self._matrix is None:
+                self._matrix = self._weigh()
+            rows, cols, weights, vocabulary, df = self._matrix
+            values = values * self._idf(df, vocabulary, buckets)
+            norm = np.linalg.norm(values)
+            if not norm:
+                return []
+            hits = np.isin(cols, buckets)
+            positions = np.searchsorted(buckets, cols[hits])
+            scores = np.bincount(rows[hits], weights=weights[hits] * values[positions] / norm, minlength=len(self._facts))
+            top = np.argsort(-scores, kind='stable')[:limit]
+            return [self._facts[i] for i in top if scores[i] >= MIN_SCORE]
+
+    def _idf(self, df, vocabulary, buckets):
+        positions = np.minimum(np.searchsorted(vocabulary, buckets), len(vocabulary) - 1)
+        counts = np.where(vocabulary[positions] == buckets, df[positions], 0)
+        return (np.log((1 + len(self._facts)) / (1 + counts)) + 1).astype(np.float32)
+
+    def _weigh(self):
+        """Flatten the stored term frequencies into L2-normalised TF-IDF triples."""
+        rows = np.repeat(np.arange(len(self._terms)), [len(buckets) for buckets, _ in self._terms])
+        cols = np.concatenate([buckets for buckets, _ in self._terms])
+        tf = np.concatenate([values for _, values in self._terms])
+        vocabulary, df = np.unique(cols, return_counts=True)
+        weights = tf * self._idf(df, vocabulary, cols)
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=len(self._terms)))
+        weights = weights / np.where(norms == 0, 1, norms)[rows]
+        return rows, cols, weights, vocabulary, df
+
+    def _current_versions(self):
+        return tuple(catalog_version(apps.get_model(label)) for label in CATALOG_MODELS)
+
+    def _refresh(self):
+        """Fold pending changes in. Returns True if the caller must run a full rebuild."""
+        if self._rebuild_lock.locked():
+            # Changes made meanwhile are applied to the new index afterwards.
+            return False
+        stale = time.monotonic() - self._built_at > REBUILD_INTERVAL
+        if self._versions is None or stale:
+            return self._claim_rebuild()
+        if self._changed:
+            self._update()
+            self._versions = self._current_versions()
+        elif self._current_versions() != self._versions:
+            # Changed by another worker; we don't know which rows.
+            return self._claim_rebuild()
+        return False
+
+    def _claim_rebuild(self):
+        if not self._rebuild_lock.acquire(blocking=False):
+            return False
+        # The rebuild reads every row after this point.
+        self._changed.clear()
+        return True
+
+    def _rebuild(self):
+        """Build a new index without holding the index lock, then swap it in."""
+        try:
+            fresh = CatalogIndex()
+            fresh._build()
+            with self._lock:
+                for name in self.INDEX:
+                    setattr(self, name, getattr(fresh, name))
+        finally:
+            self._rebuild_lock.release()
+
+    def _build(self):
+        versions = self._current_versions()
+        now = timezone.now()
+        self._versions = versions
+        self._built_at = time.monotonic()
+        for label in CATALOG_MODELS:
+            for instance in apps.get_model(label)._default_manager.order_by('pk'):
+                self._rows[(label, instance.pk)] = len(self._keys)
+                self._keys.append((label, instance.pk))
+                fact = FACTS[label](instance, now)
+                self._facts.append(fact)
+                self._terms.append(term_frequencies(fact))
+        if self._facts:
+            self._matrix = self._weigh()
+
+    def _update(self):
+        """Re-embed only the changed rows."""
+        changed, self._changed = self._changed, set()
+        now = timezone.now()
+        removed = set()
+        for label, pk in changed:
+            instance = apps.get_model(label)._default_manager.filter(pk=pk).first()
+            row = self._rows.get((label, pk))
+            if instance is None:
+                if row is not None:
+                    removed.add(row)
+                continue
+            fact = FACTS[label](instance, now)
+            if row is None:
+                self._rows[(label, pk)] = len(self._keys)
+                self._keys.append((label, pk))
+                self._facts.append(fact)
+                self._terms.append(term_frequencies(fact))
+            else:
+                self._facts[row] = fact
+                self._terms[row] = term_frequencies(fact)
+        if removed:
+            keep = [i for i in range(len(self._keys)) if i not in removed]
+            self._keys = [self._keys[i] for i in keep]
+            self._facts = [self._facts[i] for i in keep]
+            self._terms = [self._terms[i] for i in keep]
+            self._rows = {key: i for i, key in enumerate(self._keys)}
+        self._matrix = None
+
+
+catalog_index = CatalogIndex()
+
+
+def _catalog_changed(sender, instance, **kwargs):
+    catalog_index.mark_changed(sender._meta.label, instance.pk)
+
+
+def connect_signals():
+    for label in CATALOG_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_catalog_changed, sender=model, dispatch_uid=f'catalog-index-save-{label}')
+        post_delete.connect(_catalog_changed, sender=model, dispatch_uid=f'catalog-index-delete-{label}')
+
+
+def catalog_facts_prompt(question):
+    """A system message with the catalog facts relevant to ``question``, or ``None``."""
+    facts = catalog_index.search(question)
+    if not facts:
+        return None
+    today = timezone.localdate()
+    header = f"Catalog facts relevant to the question (today is {dateformat.format(today, 'F j, Y')}):"
+    return '\n'.join([header, *(f'- {fact}' for fact in facts)])
@@ -1,3 +1,13 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
 
-# Create your tests here.
+from .cache import normalize
+
+
+class NormalizeTests(SimpleTestCase):
+    def test_question_words_are_kept(self):
+        self.assertNotEqual(normalize('When is the next event?'), normalize('Where is the next event?'))
+        self.assertNotEqual(normalize('Who is DJ Whizzy?'), normalize('What is DJ Whizzy?'))
+
+    def test_contractions_match_the_long_form(self):
+        self.assertEqual(normalize("When's the next event?"), normalize('When is the next event?'))
+        self.assertEqual(normalize("what's new"), normalize('What is new?'))
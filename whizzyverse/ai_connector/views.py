@@ -1,69 +1,156 @@
-from django.shortcuts import render
 from django.conf import settings
-from rest_framework.decorators import api_view
-from rest_framework.response import Response
-from rest_framework import status
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from asgiref.sync import sync_to_async
 import json
-import os
-from openai import OpenAI
+import logging
+from whizzyverse.analytics.live import format_event
+from whizzyverse.core.throttling import rate_limit
+from .cache import response_cache
+from .llm import Unavailable, complete, stream_completion
+from .memory import build_messages, conversations
+from .persona import load_whizzy_persona
+from .retrieval import catalog_facts_prompt
 
+logger = logging.getLogger(__name__)
 
-def load_whizzy_persona():
-    persona_path = os.path.join(settings.BASE_DIR, 'seed', 'whizzy_persona.json')
-    try:
-        with open(persona_path, 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
+OFFLINE_REPLY = "Yo! WhizBot here! I'm currently in offline mode, but I'm still hyped to be part of the WhizzyVerse! To unlock my full AI capabilities and have real conversations, you'll need to add an OPENAI_API_KEY to your environment. Until then, I'm here in spirit, ready to represent DJ Whizzy and the Sound Dimension! Stay tuned, fam! 🎧✨"
+ERROR_REPLY = "Yo! WhizBot here! I'm experiencing some technical difficulties right now, but the vibe is still strong! The WhizzyVerse is always here for you. Try again in a moment, fam! 🎵"
+
+
+def record_chat():
+    from whizzyverse.analytics.events import record_event
+    from whizzyverse.analytics.models import Analytics, AnalyticsEvent
+    analytics = Analytics.get_or_create_today()
+    analytics.increment_chat_sessions()
+    record_event(AnalyticsEvent.CHAT)
+
+
+def completion_options(persona, user_message, history=()):
+    # Include the previous question so follow-ups ("how much are tickets?") find the same facts.
+    query = f'{history[-1][0]} {user_message}' if history else user_message
+    context = catalog_facts_prompt(query)
+    return {
+        'model': 'gpt-4',
+        'messages': build_messages(persona.get('system_prompt', ''), history, user_message, context),
+        'max_tokens': 300,
+        'temperature': 0.8,
+    }
+
+
+def read_chat(request):
+    """The message and session id posted as JSON or form data."""
+    data = request.POST
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            data = {}
+        if not isinstance(data, dict):
+            data = {}
+    return str(data.get('message') or ''), str(data.get('session_id') or '')
+
+
+async def cached_answer(user_message, history):
+    # An answer is only reusable for a question asked without earlier context.
+    if history:
         return None
+    return await sync_to_async(response_cache.get)(user_message)
 
 
-@api_view(['POST'])
-def chat_with_whizbot(request):
-    user_message = request.data.get('message', '')
-    
+@csrf_exempt
+@require_POST
+@rate_limit('chat')
+async def chat_with_whizbot(request):
+    user_message, session_id = read_chat(request)
+
     if not user_message:
-        return Response(
-            {'error': 'Message is required'}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
+        return JsonResponse({'error': 'Message is required'}, status=400)
+
+    history = conversations.history(session_id)
+    cached = await cached_answer(user_message, history)
+    if cached is not None:
+        conversations.append(session_id, user_message, cached)
+        await sync_to_async(record_chat)()
+        return JsonResponse({'response': cached, 'cached': True})
+
     persona = load_whizzy_persona()
     if not persona:
-        return Response(
-            {'error': 'WhizBot persona not loaded'}, 
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
-    
-    api_key = settings.OPENAI_API_KEY
-    if not api_key:
-        return Response({
-            'response': "Yo! WhizBot here! I'm currently in offline mode, but I'm still hyped to be part of the WhizzyVerse! To unlock my full AI capabilities and have real conversations, you'll need to add an OPENAI_API_KEY to your environment. Until then, I'm here in spirit, ready to represent DJ Whizzy and the Sound Dimension! Stay tuned, fam! 🎧✨"
-        })
-    
+        return JsonResponse({'error': 'WhizBot persona not loaded'}, status=500)
+
+    if not settings.OPENAI_API_KEY:
+        return JsonResponse({'response': OFFLINE_REPLY})
+
     try:
-        client = OpenAI(api_key=api_key)
-        
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": persona.get('system_prompt', '')},
-                {"role": "user", "content": user_message}
-            ],
-            max_tokens=300,
-            temperature=0.8,
-        )
-        
-        whizbot_response = response.choices[0].message.content
-        
-        from whizzyverse.analytics.models import Analytics
-        analytics = Analytics.get_or_create_today()
-        analytics.increment_chat_sessions()
-        
-        return Response({
-            'response': whizbot_response
-        })
-        
-    except Exception as e:
-        return Response({
-            'response': f"Yo! WhizBot here! I'm experiencing some technical difficulties right now, but the vibe is still strong! The WhizzyVerse is always here for you. Try again in a moment, fam! 🎵"
-        })
+        options = await sync_to_async(completion_options)(persona, user_message, history)
+        whizbot_response = await complete(options)
+    except Unavailable:
+        return JsonResponse({'response': ERROR_REPLY})
+    except Exception:
+        logger.exception('WhizBot completion failed')
+        return JsonResponse({'response': ERROR_REPLY})
+
+    if not history:
+        await sync_to_async(response_cache.set)(user_message, whizbot_response)
+    conversations.append(session_id, user_message, whizbot_response)
+    await sync_to_async(record_chat)()
+    return JsonResponse({'response': whizbot_response})
+
+
+@csrf_exempt
+@require_POST
+@rate_limit('chat')
+async def chat_stream(request):
+    """Stream WhizBot's answer as Server-Sent Events: ``token`` events, then ``done``"""
+    user_message, session_id = read_chat(request)
+    if not user_message:
+        return JsonResponse({'error': 'Message is required'}, status=400)
+
+    persona = None
+    history = conversations.history(session_id)
+    cached = await cached_answer(user_message, history)
+    if cached is None:
+        persona = load_whizzy_persona()
+        if not persona:
+            return JsonResponse({'error': 'WhizBot persona not loaded'}, status=500)
+
+    async def events():
+        if cached is not None:
+            conversations.append(session_id, user_message, cached)
+            await sync_to_async(record_chat)()
+            yield format_event('token', {'text': cached})
+            yield format_event('done', {'cached': True})
+            return
+        if not settings.OPENAI_API_KEY:
+            yield format_event('token', {'text': OFFLINE_REPLY})
+            yield format_event('done', {})
+            return
+
+        parts = []
+        try:
+            options = await sync_to_async(completion_options)(persona, user_message, history)
+            async for text in stream_completion(options):
+                parts.append(text)
+                yield format_event('token', {'text': text})
+        except Unavailable:
+            yield format_event('token', {'text': ERROR_REPLY})
+            yield format_event('done', {})
+            return
+        except Exception:
+            logger.exception('WhizBot completion failed')
+            # Replace a partial answer rather than leave it cut off mid-sentence.
+            yield format_event('error', {'text': ERROR_REPLY})
+            return
+
+        answer = ''.join(parts)
+        if not history:
+            await sync_to_async(response_cache.set)(user_message, answer)
+        conversations.append(session_id, user_message, answer)
+        await sync_to_async(record_chat)()
+        yield format_event('done', {})
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Analytics
+from .models import Analytics, AnalyticsRollup
 
 
 @admin.register(Analytics)
@@ -8,3 +8,10 @@ class AnalyticsAdmin(admin.ModelAdmin):
     list_filter = ['created_at']
     readonly_fields = ['created_at', 'updated_at']
     date_hierarchy = 'created_at'
+
+
+@admin.register(AnalyticsRollup)
+class AnalyticsRollupAdmin(admin.ModelAdmin):
+    list_display = ['bucket', 'granularity', 'kind', 'genre', 'count']
+    list_filter = ['granularity', 'kind']
+    date_hierarchy = 'bucket'
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'whizzyverse.analytics'
+
+    def ready(self):
+        import whizzyverse.analytics.events
+        import whizzyverse.analytics.uniques
+        import whizzyverse.analytics.view_counter
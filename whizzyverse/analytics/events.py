@@ -0,0 +1,59 @@
+"""
+Append-only engagement event log.
+
+``record_event`` buffers an event in process memory; the write-behind flusher
+inserts buffered events with one ``bulk_create`` per batch and then folds the
+new rows into the hourly and daily rollups (see ``rollups``). Events that
+cannot be inserted are spooled like any other write-behind batch.
+"""
+import logging
+import time
+from datetime import datetime, timezone
+
+from whizzyverse.core.write_behind import WriteBehindBuffer
+from .models import AnalyticsEvent
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH_SIZE = 500
+
+
+class EventLog(WriteBehindBuffer):
+    """Buffers ``(kind, timestamp, track_id, genre)`` tuples for batched inserts."""
+    name = 'events'
+
+    def empty(self):
+        return []
+
+    def merge(self, pending, event):
+        pending.append(event)
+
+    def apply(self, batch):
+        AnalyticsEvent.objects.bulk_create(
+            [
+                AnalyticsEvent(
+                    kind=kind,
+                    occurred_at=datetime.fromtimestamp(timestamp, tz=timezone.utc),
+                    track_id=track_id,
+                    genre=genre or '',
+                )
+                for kind, timestamp, track_id, genre in batch
+            ],
+            batch_size=INSERT_BATCH_SIZE,
+        )
+        # The events are committed; a failed rollup is retried by the next one.
+        from .rollups import roll_up
+        try:
+            roll_up()
+        except Exception:
+            logger.exception('Rolling up analytics events failed')
+
+    def load(self, data):
+        return [tuple(event) for event in data]
+
+
+event_log = EventLog()
+
+
+def record_event(kind, track_id=None, genre=''):
+    event_log.add((kind, time.time(), track_id, genre))
@@ -0,0 +1,72 @@
+"""
+HyperLogLog cardinality sketches.
+
+A sketch estimates how many distinct values were added to it using
+``REGISTERS`` one-byte registers, whatever the number of values. Two sketches
+are merged by taking the larger of each pair of registers, which gives exactly
+the sketch of the union, so daily sketches can be rolled up into weeks, months
+or all time without the raw values. Adding a value twice, or merging the same
+sketch twice, changes nothing.
+
+With 2**12 registers a sketch is 4 KB and the relative standard error of the
+estimate is about 1.6%.
+"""
+import hashlib
+import math
+
+import numpy as np
+
+PRECISION = 12
+REGISTERS = 1 << PRECISION
+RELATIVE_ERROR = 1.04 / math.sqrt(REGISTERS)
+
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+_RANK_BITS = 64 - PRECISION
+
+
+def register_update(value):
+    """Return the ``(index, rank)`` register update for ``value`` (a string)."""
+    digest = hashlib.blake2b(value.encode(), digest_size=8, person=b'whizzy-hll').digest()
+    hashed = int.from_bytes(digest, 'big')
+    index = hashed >> _RANK_BITS
+    rank = _RANK_BITS - (hashed & ((1 << _RANK_BITS) - 1)).bit_length() + 1
+    return index, rank
+
+
+class HyperLogLog:
+    def __init__(self, registers=None):
+        if registers is None:
+            self.registers = np.zeros(REGISTERS, dtype=np.uint8)
+        else:
+            if len(registers) != REGISTERS:
+                raise ValueError(f'A sketch has {REGISTERS} registers, got {len(registers)}')
+            self.registers = np.frombuffer(bytes(registers), dtype=np.uint8).copy()
+
+    @classmethod
+    def union(cls, blobs):
+        """Merge serialized sketches into one."""
+        sketch = cls()
+        for blob in blobs:
+            np.maximum(sketch.registers, np.frombuffer(bytes(blob), dtype=np.uint8), out=sketch.registers)
+        return sketch
+
+    def add(self, value):
+        self.update(*register_update(value))
+
+    def update(self, index, rank):
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def estimate(self):
+        raw = _ALPHA * REGISTERS * REGISTERS / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        empty = int(np.count_nonzero(self.registers == 0))
+        if raw <= 2.5 * REGISTERS and empty:
+            # Linear counting is more accurate while many registers are still empty.
+            return round(REGISTERS * math.log(REGISTERS / empty))
+        return round(raw)
+
+    def to_bytes(self):
+        return self.registers.tobytes()
@@ -0,0 +1,139 @@
+"""
+Live dashboard counters pushed over Server-Sent Events.
+
+One ``DashboardBroadcaster`` per process owns the counter snapshot. While at
+least one dashboard is connected, a background thread recomputes the snapshot
+at most once per ``ANALYTICS_STREAM_INTERVAL`` seconds and hands only the
+changed fields to every subscriber's queue through its event loop. A new
+subscriber gets the current snapshot without forcing a recompute, so the
+database cost is one query loop per process whatever the number of dashboards.
+The thread stops when the last subscriber leaves.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, Q
+
+logger = logging.getLogger(__name__)
+
+COUNTER_FIELDS = ['track_plays', 'chat_sessions', 'total_fans', 'page_views', 'merch_views', 'event_views']
+
+# Messages a slow client may fall behind by before it is resynced with a full snapshot.
+QUEUE_SIZE = 16
+
+
+def compute_snapshot():
+    from whizzyverse.tracks.models import Track
+    from .models import Analytics
+    counters = Analytics.objects.order_by('-date').values(*COUNTER_FIELDS).first() or dict.fromkeys(COUNTER_FIELDS, 0)
+    tracks = Track.objects.aggregate(total=Count('id'), featured=Count('id', filter=Q(featured=True)))
+    return {
+        **counters,
+        'total_tracks': tracks['total'],
+        'featured_tracks': tracks['featured'],
+        'avg_plays_per_track': round(counters['track_plays'] / tracks['total']) if tracks['total'] else 0,
+    }
+
+
+def format_event(event, data, event_id=None):
+    lines = [f'event: {event}']
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'data: {json.dumps(data, separators=(",", ":"))}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class Subscription:
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.synced = False
+
+    def push(self, message, resync=None):
+        """Called on the subscriber's event loop."""
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            if resync is not None:
+                message = resync
+        self.queue.put_nowait(message)
+
+
+class DashboardBroadcaster:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._subscribers = set()
+        self._thread = None
+        self._snapshot = None
+        self._computed_at = 0.0
+        self._sequence = 0
+
+    @property
+    def interval(self):
+        return getattr(settings, 'ANALYTICS_STREAM_INTERVAL', 2.0)
+
+    def subscribe(self):
+        subscription = Subscription(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='analytics-broadcaster', daemon=True)
+                self._thread.start()
+        self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._subscribers:
+                    self._thread = None
+                    return
+                subscribers = list(self._subscribers)
+            try:
+                self._tick(subscribers)
+            except Exception:
+                logger.exception('Refreshing the live dashboard snapshot failed')
+                self._computed_at = time.monotonic()
+            finally:
+                connections.close_all()
+            delay = max(self._computed_at + self.interval - time.monotonic(), 0.05)
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def _tick(self, subscribers):
+        delta = None
+        if self._snapshot is None or time.monotonic() - self._computed_at >= self.interval:
+            previous, self._snapshot = self._snapshot, compute_snapshot()
+            self._computed_at = time.monotonic()
+            if previous is not None:
+                delta = {key: value for key, value in self._snapshot.items() if previous.get(key) != value}
+                if delta:
+                    self._sequence += 1
+
+        snapshot = format_event('snapshot', self._snapshot, self._sequence)
+        update = format_event('delta', delta, self._sequence) if delta else None
+        for subscription in subscribers:
+            if not subscription.synced:
+                subscription.synced = True
+                message = snapshot
+            elif update:
+                message = update
+            else:
+                continue
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.push, message, snapshot)
+            except RuntimeError:
+                self.unsubscribe(subscription)  # its event loop has closed
+
+
+live_dashboard = DashboardBroadcaster()
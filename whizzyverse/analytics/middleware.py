@@ -0,0 +1,68 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from .events import record_event
+from .models import AnalyticsEvent
+from .uniques import record_visitor
+from .view_counter import view_counter
+
+# URL name -> Analytics counters bumped by one successful page view (a 304 revisit counts too).
+COUNTED_VIEWS = {
+    'landing': ('page_views',),
+    'music_library': ('page_views',),
+    'events': ('page_views', 'event_views'),
+    'merch_store': ('page_views', 'merch_views'),
+}
+
+
+class ViewCountingMiddleware:
+    """
+    Count page views of the main site sections.
+
+    Views are added to in-memory counters and written to today's ``Analytics``
+    row and unique visitor sketch by the write-behind flusher, so counting
+    costs no database work during the request.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Stay async under ASGI so async views don't each hold a thread.
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.get_response(request)
+        fields = _counted_fields(request, response)
+        if fields:
+            _count_view(request, fields)
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        fields = _counted_fields(request, response)
+        if fields:
+            # The visitor key may load the session or user from the database.
+            await sync_to_async(_count_view)(request, fields)
+        return response
+
+
+def _counted_fields(request, response):
+    if request.method != 'GET' or response.status_code not in (200, 304) or _is_prefetch(request):
+        return None
+    match = request.resolver_match
+    return COUNTED_VIEWS.get(match.url_name) if match else None
+
+
+def _count_view(request, fields):
+    view_counter.add(fields)
+    record_event(AnalyticsEvent.VIEW)
+    record_visitor(request)
+
+
+def _is_prefetch(request):
+    purpose = request.headers.get('Sec-Purpose') or request.headers.get('Purpose') or ''
+    return 'prefetch' in purpose
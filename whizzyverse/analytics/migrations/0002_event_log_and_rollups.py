@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, 'Play'), (2, 'View'), (3, 'Chat')])),
+                ('occurred_at', models.DateTimeField()),
+                ('track_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('genre', models.CharField(blank=True, max_length=100)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_event_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AnalyticsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('bucket', models.DateTimeField()),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, 'Play'), (2, 'View'), (3, 'Chat')])),
+                ('genre', models.CharField(blank=True, max_length=100)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['granularity', 'bucket'],
+                'constraints': [models.UniqueConstraint(fields=('granularity', 'bucket', 'kind', 'genre'), name='unique_analytics_rollup')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_event_log_and_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UniqueSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.PositiveSmallIntegerField(choices=[(1, 'Site visitors'), (2, 'Track listeners')])),
+                ('track_id', models.PositiveIntegerField(default=0)),
+                ('day', models.DateField(blank=True, null=True)),
+                ('registers', models.BinaryField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['scope', 'track_id', 'day'],
+                'constraints': [models.UniqueConstraint(fields=('scope', 'track_id', 'day'), name='unique_daily_sketch'), models.UniqueConstraint(condition=models.Q(('day__isnull', True)), fields=('scope', 'track_id'), name='unique_all_time_sketch')],
+            },
+        ),
+    ]
@@ -1,8 +1,12 @@
-from django.db import models
+from django.db import IntegrityError, models
+from django.db.models import F
 from django.utils import timezone
 
 
 class Analytics(models.Model):
+    # Running totals carried over to each new day; the other counters restart at zero.
+    CUMULATIVE_FIELDS = ('track_plays', 'total_fans')
+
     date = models.DateField(unique=True)
     track_plays = models.IntegerField(default=0)
     chat_sessions = models.IntegerField(default=0)
@@ -23,27 +27,150 @@ class Analytics(models.Model):
     @classmethod
     def get_or_create_today(cls):
         today = timezone.now().date()
-        analytics, created = cls.objects.get_or_create(
-            date=today,
-            defaults={
-                'track_plays': 0,
-                'chat_sessions': 0,
-                'total_fans': 0,
-                'page_views': 0,
-                'merch_views': 0,
-                'event_views': 0,
-            }
-        )
-        return analytics
+        try:
+            return cls.objects.get(date=today)
+        except cls.DoesNotExist:
+            pass
+        defaults = {
+            'track_plays': 0,
+            'chat_sessions': 0,
+            'total_fans': 0,
+            'page_views': 0,
+            'merch_views': 0,
+            'event_views': 0,
+        }
+        previous = cls.objects.filter(date__lt=today).values(*cls.CUMULATIVE_FIELDS).first()
+        if previous:
+            defaults.update(previous)
+        try:
+            return cls.objects.create(date=today, **defaults)
+        except IntegrityError:
+            return cls.objects.get(date=today)
+
+    @classmethod
+    def apply_deltas(cls, **deltas):
+        """Add deltas to today's counters with a single UPDATE, creating the row if needed."""
+        updates = {field: F(field) + delta for field, delta in deltas.items() if delta}
+        if not updates:
+            return
+        today = timezone.now().date()
+        if not cls.objects.filter(date=today).update(updated_at=timezone.now(), **updates):
+            cls.get_or_create_today()
+            cls.objects.filter(date=today).update(updated_at=timezone.now(), **updates)
+
+    @classmethod
+    def reconcile_today(cls):
+        """Recompute today's running totals from the source tables to correct drift."""
+        from whizzyverse.tracks.models import Track
+        from whizzyverse.newsletter.models import NewsletterSubscriber
+        totals = {
+            'track_plays': Track.objects.aggregate(total=models.Sum('plays'))['total'] or 0,
+            'total_fans': NewsletterSubscriber.objects.filter(is_active=True).count(),
+        }
+        cls.get_or_create_today()
+        cls.objects.filter(date=timezone.now().date()).update(updated_at=timezone.now(), **totals)
+        return totals
+
+    def _increment(self, field):
+        type(self).objects.filter(pk=self.pk).update(**{field: F(field) + 1}, updated_at=timezone.now())
+        setattr(self, field, getattr(self, field) + 1)
 
     def increment_track_plays(self):
-        self.track_plays += 1
-        self.save()
+        self._increment('track_plays')
 
     def increment_chat_sessions(self):
-        self.chat_sessions += 1
-        self.save()
+        self._increment('chat_sessions')
 
     def increment_page_views(self):
-        self.page_views += 1
-        self.save()
+        self._increment('page_views')
+
+
+class AnalyticsEvent(models.Model):
+    """One raw engagement event. Append-only; written in batches by ``events.event_log``."""
+    PLAY = 1
+    VIEW = 2
+    CHAT = 3
+    KIND_CHOICES = [
+        (PLAY, 'Play'),
+        (VIEW, 'View'),
+        (CHAT, 'Chat'),
+    ]
+
+    kind = models.PositiveSmallIntegerField(choices=KIND_CHOICES)
+    occurred_at = models.DateTimeField()
+    track_id = models.PositiveIntegerField(blank=True, null=True)
+    genre = models.CharField(max_length=100, blank=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.get_kind_display()} at {self.occurred_at}"
+
+
+class AnalyticsRollup(models.Model):
+    """Event counts per hour or day, kind and genre, maintained by ``rollups.roll_up``."""
+    HOUR = 'hour'
+    DAY = 'day'
+    GRANULARITY_CHOICES = [
+        (HOUR, 'Hour'),
+        (DAY, 'Day'),
+    ]
+
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket = models.DateTimeField()
+    kind = models.PositiveSmallIntegerField(choices=AnalyticsEvent.KIND_CHOICES)
+    genre = models.CharField(max_length=100, blank=True)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['granularity', 'bucket']
+        constraints = [
+            models.UniqueConstraint(fields=['granularity', 'bucket', 'kind', 'genre'], name='unique_analytics_rollup'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.granularity} {self.bucket}: {self.count}"
+
+
+class RollupWatermark(models.Model):
+    """Id of the last ``AnalyticsEvent`` folded into the rollups."""
+    name = models.CharField(max_length=50, unique=True)
+    last_event_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_event_id}"
+
+
+class UniqueSketch(models.Model):
+    """
+    HyperLogLog registers (see ``hll``) of the distinct site visitors or track
+    listeners seen on ``day``, or over all time when ``day`` is empty.
+    """
+    SITE = 1
+    TRACK = 2
+    SCOPE_CHOICES = [
+        (SITE, 'Site visitors'),
+        (TRACK, 'Track listeners'),
+    ]
+
+    scope = models.PositiveSmallIntegerField(choices=SCOPE_CHOICES)
+    # 0 for site sketches.
+    track_id = models.PositiveIntegerField(default=0)
+    day = models.DateField(blank=True, null=True)
+    registers = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['scope', 'track_id', 'day']
+        constraints = [
+            models.UniqueConstraint(fields=['scope', 'track_id', 'day'], name='unique_daily_sketch'),
+            models.UniqueConstraint(
+                fields=['scope', 'track_id'], condition=models.Q(day__isnull=True), name='unique_all_time_sketch'
+            ),
+        ]
+
+    def __str__(self):
+        subject = f"track {self.track_id}" if self.scope == self.TRACK else 'site'
+        return f"Unique {subject} {self.day or 'all time'}"
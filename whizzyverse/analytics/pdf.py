@@ -0,0 +1,56 @@
+"""
+ReportLab rendering of analytics reports.
+
+This module only depends on ReportLab and takes plain data, so it can be
+imported and run in a spawned worker process without setting up Django.
+"""
+import os
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#7A00FF')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+])
+
+
+def render_report(report, path):
+    """
+    Render ``report`` to ``path`` atomically.
+
+    ``report`` is a dict with ``title``, ``subtitle``, ``summary`` (rows of
+    label/value) and ``header`` plus ``rows`` for the per-period table.
+    """
+    tmp = f'{path}.{os.getpid()}.tmp'
+    doc = SimpleDocTemplate(tmp, pagesize=letter)
+    styles = getSampleStyleSheet()
+
+    summary = Table([['Metric', 'Value'], *[[label, str(value)] for label, value in report['summary']]],
+                    colWidths=[4 * inch, 2 * inch])
+    summary.setStyle(TABLE_STYLE)
+    elements = [
+        Paragraph(f"<b>{report['title']}</b>", styles['Title']),
+        Spacer(1, 0.3 * inch),
+        Paragraph(report['subtitle'], styles['Normal']),
+        Spacer(1, 0.3 * inch),
+        summary,
+    ]
+    if report['rows']:
+        periods = Table([report['header'], *[[str(value) for value in row] for row in report['rows']]],
+                        repeatRows=1)
+        periods.setStyle(TABLE_STYLE)
+        elements += [Spacer(1, 0.4 * inch), periods]
+
+    doc.build(elements)
+    os.replace(tmp, path)
+    return path
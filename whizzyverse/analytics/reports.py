@@ -0,0 +1,118 @@
+"""
+Cached, background-rendered PDF reports.
+
+A report is identified by the SHA-256 of the data it shows, so an unchanged
+range maps to the same file in ``ANALYTICS_REPORTS_DIR`` and is served straight
+from disk. A missing report is rendered in a process pool. The requester gets
+the digest and polls for the file. A ``<digest>.pending`` marker
+tells other worker processes that a render is under way.
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from django.conf import settings
+
+from .models import Analytics
+from .pdf import render_report
+from .utils import DAILY_COLUMNS, daily_rows
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout changes so cached files are re-rendered.
+REPORT_VERSION = 1
+# A pending marker older than this belongs to a render that died.
+PENDING_TIMEOUT = 300
+
+DAILY_LABELS = ['Page Views', 'Track Plays (Total)', 'Chat Sessions', 'Total Fans', 'Merch Views', 'Event Views']
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def reports_dir():
+    return Path(getattr(settings, 'ANALYTICS_REPORTS_DIR', Path(settings.BASE_DIR) / 'var' / 'reports'))
+
+
+def build_report(start, end, granularity):
+    """Collect the data shown in a report and its content digest."""
+    rows = list(daily_rows(start, end, granularity))
+    summary = []
+    for position, (label, column) in enumerate(zip(DAILY_LABELS, DAILY_COLUMNS), start=1):
+        values = [row[position] for row in rows]
+        if not values:
+            total = 0
+        elif column in Analytics.CUMULATIVE_FIELDS:
+            total = values[-1]
+        else:
+            total = sum(values)
+        summary.append([label, total])
+    report = {
+        'title': 'WhizzyVerse Analytics Report',
+        'subtitle': f'{start.isoformat()} to {end.isoformat()}, by {granularity}',
+        'summary': summary,
+        'header': [granularity.title(), *DAILY_LABELS],
+        'rows': rows,
+    }
+    payload = json.dumps([REPORT_VERSION, report], sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest(), report
+
+
+def report_path(digest):
+    return reports_dir() / f'{digest}.pdf'
+
+
+def _pending_path(digest):
+    return reports_dir() / f'{digest}.pending'
+
+
+def is_pending(digest):
+    try:
+        return time.time() - os.stat(_pending_path(digest)).st_mtime < PENDING_TIMEOUT
+    except OSError:
+        return False
+
+
+def _get_pool():
+    global _pool, _pool_pid
+    with _pool_lock:
+        # Workers forked from a preloaded master must not reuse its pool.
+        if _pool is None or _pool_pid != os.getpid():
+            workers = getattr(settings, 'ANALYTICS_REPORT_WORKERS', 2)
+            # Spawned children only import the ReportLab renderer, not Django.
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pool_pid = os.getpid()
+        return _pool
+
+
+def request_report(digest, report):
+    """Start rendering ``report`` unless it is cached or already rendering. Returns True when ready."""
+    if report_path(digest).is_file():
+        return True
+    if is_pending(digest):
+        return False
+    reports_dir().mkdir(parents=True, exist_ok=True)
+    _pending_path(digest).write_text(str(os.getpid()))
+    future = _get_pool().submit(render_report, report, str(report_path(digest)))
+    future.add_done_callback(lambda done: _finished(digest, done))
+    return False
+
+
+def _finished(digest, future):
+    global _pool
+    error = future.exception()
+    if error is not None:
+        logger.error('Rendering analytics report %s failed', digest, exc_info=error)
+        if isinstance(error, BrokenProcessPool):
+            # A crashed worker breaks the whole pool; start a fresh one next time.
+            with _pool_lock:
+                _pool = None
+    _pending_path(digest).unlink(missing_ok=True)
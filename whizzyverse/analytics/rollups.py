@@ -0,0 +1,138 @@
+"""
+Incremental hourly and daily rollups of ``AnalyticsEvent``.
+
+``roll_up`` reads only events with an id above the watermark, groups them by
+hour, kind and genre in SQL, and adds the counts to the hour and day rows of
+``AnalyticsRollup``. The watermark is advanced with a compare-and-set UPDATE as
+the first write of the same transaction, so concurrent workers cannot fold the
+same events twice. ``trends`` answers range queries from the rollups alone.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import AnalyticsEvent, AnalyticsRollup, RollupWatermark
+
+WATERMARK = 'analytics-rollup'
+ROLLUP_BATCH_SIZE = 50000
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+SERIES = {AnalyticsEvent.PLAY: 'plays', AnalyticsEvent.VIEW: 'views', AnalyticsEvent.CHAT: 'chats'}
+
+
+def roll_up(batch_size=ROLLUP_BATCH_SIZE):
+    """Fold new events into the rollups. Returns the number of events processed."""
+    processed = 0
+    while True:
+        count = _roll_up_batch(batch_size)
+        processed += count
+        if count < batch_size:
+            return processed
+
+
+def _roll_up_batch(batch_size):
+    watermark, _ = RollupWatermark.objects.get_or_create(name=WATERMARK)
+    start = watermark.last_event_id
+    new_events = AnalyticsEvent.objects.filter(id__gt=start)
+    end = new_events.order_by('id').values_list('id', flat=True)[batch_size - 1:batch_size].first()
+    if end is None:
+        end = new_events.aggregate(end=Max('id'))['end']
+        if end is None:
+            return 0
+
+    groups = (
+        AnalyticsEvent.objects.filter(id__gt=start, id__lte=end)
+        .annotate(hour=TruncHour('occurred_at'))
+        .values('hour', 'kind', 'genre')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    deltas = defaultdict(int)
+    processed = 0
+    for group in groups:
+        hour = timezone.localtime(group['hour'])
+        day = hour.replace(hour=0)
+        deltas[(AnalyticsRollup.HOUR, hour, group['kind'], group['genre'])] += group['count']
+        deltas[(AnalyticsRollup.DAY, day, group['kind'], group['genre'])] += group['count']
+        processed += group['count']
+
+    with transaction.atomic():
+        claimed = RollupWatermark.objects.filter(pk=watermark.pk, last_event_id=start).update(
+            last_event_id=end, updated_at=timezone.now()
+        )
+        if not claimed:
+            return 0  # another worker rolled this range up first
+        _add_to_rollups(deltas)
+    return processed
+
+
+def _add_to_rollups(deltas):
+    buckets = {bucket for _, bucket, _, _ in deltas}
+    existing = {
+        (row.granularity, row.bucket, row.kind, row.genre): row
+        for row in AnalyticsRollup.objects.filter(bucket__in=buckets)
+    }
+    changed, created = [], []
+    for key, count in deltas.items():
+        row = existing.get(key)
+        if row is None:
+            granularity, bucket, kind, genre = key
+            created.append(AnalyticsRollup(granularity=granularity, bucket=bucket, kind=kind, genre=genre, count=count))
+        else:
+            row.count += count
+            changed.append(row)
+    AnalyticsRollup.objects.bulk_update(changed, ['count'], batch_size=500)
+    AnalyticsRollup.objects.bulk_create(created, batch_size=500)
+
+
+def bucket_range(start, end, granularity):
+    """Return the bucket starts covering the dates ``start`` to ``end`` inclusive, and the range end."""
+    days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+    stop = local_midnight(end + timedelta(days=1))
+    if granularity == AnalyticsRollup.DAY:
+        return [local_midnight(day) for day in days], stop
+    buckets = []
+    current = local_midnight(start).astimezone(dt_timezone.utc)
+    while current < stop:
+        buckets.append(timezone.localtime(current))
+        current += timedelta(hours=1)
+    return buckets, stop
+
+
+def local_midnight(day):
+    """The aware start of ``day`` in the current time zone."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def trends(start, end, granularity=AnalyticsRollup.DAY):
+    """Per-bucket series, genre popularity and weekday engagement for ``start``..``end`` (dates)."""
+    buckets, stop = bucket_range(start, end, granularity)
+    rows = AnalyticsRollup.objects.filter(granularity=granularity, bucket__gte=buckets[0], bucket__lt=stop)
+
+    index = {bucket: position for position, bucket in enumerate(buckets)}
+    series = {name: [0] * len(buckets) for name in SERIES.values()}
+    weekdays = dict.fromkeys(WEEKDAYS, 0)
+    for row in rows.values('bucket', 'kind').annotate(total=Sum('count')).order_by():
+        bucket = timezone.localtime(row['bucket'])
+        series[SERIES[row['kind']]][index[bucket]] += row['total']
+        weekdays[WEEKDAYS[bucket.weekday()]] += row['total']
+
+    genres = (
+        rows.filter(kind=AnalyticsEvent.PLAY).exclude(genre='')
+        .values('genre').annotate(total=Sum('count')).order_by('-total', 'genre')
+    )
+    label_format = '%Y-%m-%d %H:00' if granularity == AnalyticsRollup.HOUR else '%Y-%m-%d'
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'granularity': granularity,
+        'labels': [bucket.strftime(label_format) for bucket in buckets],
+        'series': series,
+        'totals': {name: sum(values) for name, values in series.items()},
+        'popular_genres': {row['genre']: row['total'] for row in genres},
+        'engagement_by_day': weekdays,
+    }
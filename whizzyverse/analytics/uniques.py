@@ -0,0 +1,121 @@
+"""
+Unique visitor and listener counts.
+
+Each counted page view and play hashes the visitor into a register update
+during the request; the write-behind flusher keeps only the largest rank per
+register and merges the batch into the day's ``UniqueSketch`` and the all-time
+sketch. Because merging is a register-wise maximum, a batch that is replayed
+from the spool is not counted twice. Weeks and months are answered by merging
+the daily sketches in range.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from whizzyverse.core.write_behind import WriteBehindBuffer
+from .hll import RELATIVE_ERROR, HyperLogLog, register_update
+from .models import UniqueSketch
+
+PERIODS = ('day', 'week', 'month', 'all')
+
+
+def visitor_key(request):
+    """A stable identifier for the person making ``request``. Only its hash is kept."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    session_key = request.session.session_key if hasattr(request, 'session') else None
+    if session_key:
+        return f'session:{session_key}'
+    address = request.META.get('REMOTE_ADDR', '')
+    return f"client:{address}|{request.headers.get('User-Agent', '')}"
+
+
+class UniqueCounter(WriteBehindBuffer):
+    """Buffers the highest rank per sketch register, keyed by ``(scope, track_id, day)``."""
+    name = 'uniques'
+
+    def merge(self, pending, item):
+        scope, track_id, day, index, rank = item
+        registers = pending.setdefault((scope, track_id, day), {})
+        if rank > registers.get(index, 0):
+            registers[index] = rank
+
+    def apply(self, batch):
+        with transaction.atomic():
+            for (scope, track_id, day), updates in batch.items():
+                for sketch_day in (day, None):
+                    _merge_into(scope, track_id, sketch_day, updates)
+
+    def dump(self, batch):
+        return [[scope, track_id, day, list(updates.items())] for (scope, track_id, day), updates in batch.items()]
+
+    def load(self, data):
+        return {(scope, track_id, day): dict(updates) for scope, track_id, day, updates in data}
+
+
+def _merge_into(scope, track_id, day, updates):
+    row = UniqueSketch.objects.select_for_update().filter(scope=scope, track_id=track_id, day=day).first()
+    sketch = HyperLogLog(row.registers if row else None)
+    for index, rank in updates.items():
+        sketch.update(index, rank)
+    if row is None:
+        UniqueSketch.objects.create(scope=scope, track_id=track_id, day=day, registers=sketch.to_bytes())
+    else:
+        row.registers = sketch.to_bytes()
+        row.save(update_fields=['registers', 'updated_at'])
+
+
+unique_counter = UniqueCounter()
+
+
+def _record(scope, track_id, request):
+    index, rank = register_update(visitor_key(request))
+    unique_counter.add((scope, track_id, timezone.localdate().isoformat(), index, rank))
+
+
+def record_visitor(request):
+    _record(UniqueSketch.SITE, 0, request)
+
+
+def record_listener(track_id, request):
+    _record(UniqueSketch.TRACK, track_id, request)
+
+
+def period_range(period, day):
+    """The first and last dates of the ``period`` containing ``day``; ``(None, None)`` for all time."""
+    if period == 'day':
+        return day, day
+    if period == 'week':
+        start = day - timedelta(days=day.weekday())
+        return start, start + timedelta(days=6)
+    if period == 'month':
+        start = day.replace(day=1)
+        following = (start + timedelta(days=32)).replace(day=1)
+        return start, following - timedelta(days=1)
+    return None, None
+
+
+def unique_estimate(scope, period='day', day=None, track_id=0):
+    """Estimated distinct visitors (or listeners of ``track_id``) in a period, with 95% bounds."""
+    start, end = period_range(period, day or timezone.localdate())
+    sketches = UniqueSketch.objects.filter(scope=scope, track_id=track_id)
+    if start is None:
+        sketches = sketches.filter(day__isnull=True)
+    else:
+        sketches = sketches.filter(day__range=(start, end))
+    blobs = list(sketches.values_list('registers', flat=True))
+    estimate = HyperLogLog.union(blobs).estimate() if blobs else 0
+    margin = round(1.96 * RELATIVE_ERROR * estimate)
+    return {
+        'scope': 'track' if scope == UniqueSketch.TRACK else 'site',
+        'track': track_id or None,
+        'period': period,
+        'start': start.isoformat() if start else None,
+        'end': end.isoformat() if end else None,
+        'estimate': estimate,
+        'relative_error': round(RELATIVE_ERROR, 4),
+        'lower': max(estimate - margin, 0),
+        'upper': estimate + margin,
+    }
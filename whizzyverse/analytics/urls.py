@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 
 app_name = 'analytics'
@@ -7,4 +7,5 @@ urlpatterns = [
     path('dashboard/', views.analytics_dashboard_view, name='dashboard'),
     path('export/csv/', views.export_csv_view, name='export_csv'),
     path('export/pdf/', views.export_pdf_view, name='export_pdf'),
+    re_path(r'^reports/(?P<digest>[0-9a-f]{64})/$', views.report_view, name='report'),
 ]
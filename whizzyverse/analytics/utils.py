@@ -1,78 +1,91 @@
 import csv
-from io import StringIO
-from django.http import HttpResponse
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-
-
-def export_analytics_csv(analytics):
-    """Export analytics data as CSV"""
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    writer.writerow(['WhizzyVerse Analytics Report'])
-    writer.writerow([])
-    writer.writerow(['Date', analytics.date])
-    writer.writerow([])
-    writer.writerow(['Metric', 'Value'])
-    writer.writerow(['Page Views', analytics.page_views])
-    writer.writerow(['Track Plays', analytics.track_plays])
-    writer.writerow(['Chat Sessions', analytics.chat_sessions])
-    writer.writerow(['Total Fans', analytics.total_fans])
-    writer.writerow(['Merch Views', analytics.merch_views])
-    writer.writerow(['Event Views', analytics.event_views])
-    
-    csv_content = output.getvalue()
-    response = HttpResponse(csv_content.encode('utf-8'), content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="whizzyverse_analytics.csv"'
-    
-    return response
+import itertools
+from datetime import timedelta
+from django.db.models import Sum
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from .models import Analytics, AnalyticsRollup
+from .rollups import SERIES, local_midnight
+
+
+# Rows fetched per round trip while streaming exports.
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_GRANULARITIES = ('hour', 'day', 'week', 'month')
+
+DAILY_COLUMNS = ['page_views', 'track_plays', 'chat_sessions', 'total_fans', 'merch_views', 'event_views']
+
+
+class Echo:
+    """File-like object whose ``write`` returns the value, for streaming ``csv.writer`` rows."""
+
+    def write(self, value):
+        return value
+
+
+def _period_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def daily_rows(start, end, granularity):
+    """Analytics rows folded into periods: running totals keep their last value, counters are summed."""
+    rows = Analytics.objects.order_by('date').values_list('date', *DAILY_COLUMNS)
+    if start:
+        rows = rows.filter(date__gte=start)
+    if end:
+        rows = rows.filter(date__lte=end)
+
+    cumulative = [column in Analytics.CUMULATIVE_FIELDS for column in DAILY_COLUMNS]
+    period, totals = None, None
+    for date, *values in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        current = _period_start(date, granularity)
+        if current != period:
+            if period is not None:
+                yield [period.isoformat(), *totals]
+            period, totals = current, [0] * len(values)
+        totals = [value if last else total + value for total, value, last in zip(totals, values, cumulative)]
+    if period is not None:
+        yield [period.isoformat(), *totals]
+
+
+def _hourly_rows(start, end):
+    """Hourly plays, views and chats pivoted from the event rollups."""
+    rows = AnalyticsRollup.objects.filter(granularity=AnalyticsRollup.HOUR)
+    if start:
+        rows = rows.filter(bucket__gte=local_midnight(start))
+    if end:
+        rows = rows.filter(bucket__lt=local_midnight(end + timedelta(days=1)))
+    rows = rows.values_list('bucket', 'kind').annotate(total=Sum('count')).order_by('bucket', 'kind')
+
+    kinds = list(SERIES)
+    bucket, counts = None, None
+    for current, kind, total in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        if current != bucket:
+            if bucket is not None:
+                yield [timezone.localtime(bucket).isoformat(), *counts]
+            bucket, counts = current, [0] * len(kinds)
+        counts[kinds.index(kind)] += total
+    if bucket is not None:
+        yield [timezone.localtime(bucket).isoformat(), *counts]
+
 
+def export_analytics_csv(start=None, end=None, granularity='day'):
+    """Stream analytics between ``start`` and ``end`` (dates, inclusive) as CSV"""
+    if granularity == 'hour':
+        header = ['Hour', 'Track Plays', 'Page Views', 'Chat Sessions']
+        rows = _hourly_rows(start, end)
+    else:
+        header = [granularity.title(), 'Page Views', 'Track Plays (Total)', 'Chat Sessions', 'Total Fans',
+                  'Merch Views', 'Event Views']
+        rows = daily_rows(start, end, granularity)
 
-def export_analytics_pdf(analytics):
-    """Export analytics data as PDF"""
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="whizzyverse_analytics.pdf"'
-    
-    doc = SimpleDocTemplate(response, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    title = Paragraph('<b>WhizzyVerse Analytics Report</b>', styles['Title'])
-    elements.append(title)
-    elements.append(Spacer(1, 0.3 * inch))
-    
-    subtitle = Paragraph(f'Report Date: {analytics.date}', styles['Normal'])
-    elements.append(subtitle)
-    elements.append(Spacer(1, 0.3 * inch))
-    
-    data = [
-        ['Metric', 'Value'],
-        ['Page Views', str(analytics.page_views)],
-        ['Track Plays', str(analytics.track_plays)],
-        ['Chat Sessions', str(analytics.chat_sessions)],
-        ['Total Fans', str(analytics.total_fans)],
-        ['Merch Views', str(analytics.merch_views)],
-        ['Event Views', str(analytics.event_views)],
-    ]
-    
-    table = Table(data, colWidths=[4 * inch, 2 * inch])
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#7A00FF')),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 12),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    elements.append(table)
-    
-    doc.build(elements)
-    
+    writer = csv.writer(Echo())
+    lines = itertools.chain([header], rows)
+    response = StreamingHttpResponse((writer.writerow(row) for row in lines), content_type='text/csv')
+    filename = f'whizzyverse_analytics_{granularity}_{start or "start"}_{end or "end"}.csv'
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
     return response
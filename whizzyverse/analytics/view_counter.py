@@ -0,0 +1,17 @@
+from whizzyverse.core.write_behind import WriteBehindBuffer
+from .models import Analytics
+
+
+class ViewCounter(WriteBehindBuffer):
+    """Buffers page view increments per ``Analytics`` field and applies them as one F() update."""
+    name = 'views'
+
+    def merge(self, pending, fields):
+        for field in fields:
+            pending[field] = pending.get(field, 0) + 1
+
+    def apply(self, batch):
+        Analytics.apply_deltas(**batch)
+
+
+view_counter = ViewCounter()
@@ -1,8 +1,18 @@
+import asyncio
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render
-from rest_framework import viewsets
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import status, viewsets
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
-from .models import Analytics
+from .models import Analytics, AnalyticsRollup, UniqueSketch
+from .rollups import trends
 from .serializers import AnalyticsSerializer
 from whizzyverse.tracks.models import Track
 
@@ -32,6 +42,102 @@ def analytics_summary(request):
     })
 
 
+def _query_date(params, name, default):
+    value = params.get(name)
+    if not value:
+        return default
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+
+STREAM_HEARTBEAT_SECONDS = 15
+STREAM_RETRY_MS = 5000
+
+# Longest range, in days, a trends query may cover at each granularity.
+MAX_TREND_DAYS = {AnalyticsRollup.HOUR: 31, AnalyticsRollup.DAY: 731}
+
+
+@api_view(['GET'])
+def analytics_trends(request):
+    """Plays, views and chats per hour or day, read from the rollups"""
+    granularity = request.query_params.get('granularity', AnalyticsRollup.DAY)
+    if granularity not in MAX_TREND_DAYS:
+        return Response({'error': 'granularity must be "hour" or "day"'}, status=status.HTTP_400_BAD_REQUEST)
+
+    end = _query_date(request.query_params, 'end', timezone.localdate())
+    default_span = timedelta(days=6 if granularity == AnalyticsRollup.DAY else 0)
+    start = _query_date(request.query_params, 'start', end - default_span if end else None)
+    if start is None or end is None:
+        return Response({'error': 'start and end must be YYYY-MM-DD dates'}, status=status.HTTP_400_BAD_REQUEST)
+    if start > end or (end - start).days >= MAX_TREND_DAYS[granularity]:
+        return Response(
+            {'error': f'start must be on or before end, at most {MAX_TREND_DAYS[granularity]} days apart'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    return Response(trends(start, end, granularity))
+
+
+@api_view(['GET'])
+def analytics_uniques(request):
+    """Estimated unique visitors, or listeners of ``?track=``, per day, week, month or all time"""
+    from .uniques import PERIODS, unique_estimate
+    period = request.query_params.get('period', 'day')
+    if period not in PERIODS:
+        return Response({'error': 'period must be one of: ' + ', '.join(PERIODS)}, status=status.HTTP_400_BAD_REQUEST)
+    day = _query_date(request.query_params, 'date', timezone.localdate())
+    if day is None:
+        return Response({'error': 'date must be a YYYY-MM-DD date'}, status=status.HTTP_400_BAD_REQUEST)
+    track = request.query_params.get('track')
+    if track is None:
+        return Response(unique_estimate(UniqueSketch.SITE, period, day))
+    if not track.isdigit() or not Track.objects.filter(pk=track).exists():
+        return Response({'error': 'Unknown track'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(unique_estimate(UniqueSketch.TRACK, period, day, track_id=int(track)))
+
+
+async def analytics_stream(request):
+    """
+    Server-Sent Events feed of the dashboard counters: a snapshot, then deltas.
+
+    Only ASGI can hold the stream open. Under WSGI (``runserver``) Django would
+    drain the endless generator before sending anything, so the reply is one
+    snapshot and the browser's ``EventSource`` polls by reconnecting after
+    ``retry``.
+    """
+    from .live import compute_snapshot, format_event, live_dashboard
+
+    if not isinstance(request, ASGIRequest):
+        snapshot = await sync_to_async(compute_snapshot)()
+        response = HttpResponse(
+            f'retry: {STREAM_RETRY_MS}\n\n' + format_event('snapshot', snapshot),
+            content_type='text/event-stream',
+        )
+        response['Cache-Control'] = 'no-cache'
+        return response
+
+    async def events():
+        # Subscribed here, not in the view, so the finally clause always runs.
+        subscription = live_dashboard.subscribe()
+        try:
+            yield f'retry: {STREAM_RETRY_MS}\n\n'
+            while True:
+                try:
+                    async with asyncio.timeout(STREAM_HEARTBEAT_SECONDS):
+                        yield await subscription.queue.get()
+                except TimeoutError:
+                    yield ': keep-alive\n\n'
+        finally:
+            live_dashboard.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 def admin_dashboard_view(request):
     try:
         analytics = Analytics.objects.latest('created_at')
@@ -57,22 +163,67 @@ def analytics_dashboard_view(request):
 
 
 def export_csv_view(request):
-    """Export analytics as CSV"""
-    from .utils import export_analytics_csv
-    try:
-        analytics = Analytics.objects.latest('created_at')
-    except Analytics.DoesNotExist:
-        analytics = Analytics.objects.create()
-    
-    return export_analytics_csv(analytics)
+    """Export analytics as CSV (``?start=``, ``?end=``, ``?granularity=hour|day|week|month``)"""
+    from .utils import EXPORT_GRANULARITIES, export_analytics_csv
+    granularity = request.GET.get('granularity', 'day')
+    if granularity not in EXPORT_GRANULARITIES:
+        return HttpResponseBadRequest('granularity must be one of: ' + ', '.join(EXPORT_GRANULARITIES))
+    start = _query_date(request.GET, 'start', None)
+    end = _query_date(request.GET, 'end', None)
+    if (request.GET.get('start') and start is None) or (request.GET.get('end') and end is None):
+        return HttpResponseBadRequest('start and end must be YYYY-MM-DD dates')
+    if start and end and start > end:
+        return HttpResponseBadRequest('start must be on or before end')
+
+    return export_analytics_csv(start, end, granularity)
+
+
+REPORT_GRANULARITIES = ('day', 'week', 'month')
+REPORT_POLL_SECONDS = 2
+
+
+def _report_file_response(digest):
+    from .reports import report_path
+    response = FileResponse(
+        open(report_path(digest), 'rb'), as_attachment=True,
+        filename=f'whizzyverse_analytics_{digest[:12]}.pdf', content_type='application/pdf',
+    )
+    response['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
+
+def _report_pending_response(request, digest):
+    poll_url = request.build_absolute_uri(reverse('analytics:report', args=[digest]))
+    response = JsonResponse({'status': 'pending', 'report': digest, 'poll_url': poll_url}, status=202)
+    response['Location'] = poll_url
+    response['Retry-After'] = str(REPORT_POLL_SECONDS)
+    return response
 
 
 def export_pdf_view(request):
-    """Export analytics as PDF"""
-    from .utils import export_analytics_pdf
-    try:
-        analytics = Analytics.objects.latest('created_at')
-    except Analytics.DoesNotExist:
-        analytics = Analytics.objects.create()
-    
-    return export_analytics_pdf(analytics)
+    """Export analytics as PDF (``?start=``, ``?end=``, ``?granularity=day|week|month``)"""
+    from .reports import build_report, request_report
+    granularity = request.GET.get('granularity', 'day')
+    if granularity not in REPORT_GRANULARITIES:
+        return HttpResponseBadRequest('granularity must be one of: ' + ', '.join(REPORT_GRANULARITIES))
+    end = _query_date(request.GET, 'end', timezone.localdate())
+    start = _query_date(request.GET, 'start', end - timedelta(days=29) if end else None)
+    if start is None or end is None:
+        return HttpResponseBadRequest('start and end must be YYYY-MM-DD dates')
+    if start > end:
+        return HttpResponseBadRequest('start must be on or before end')
+
+    digest, report = build_report(start, end, granularity)
+    if request_report(digest, report):
+        return _report_file_response(digest)
+    return _report_pending_response(request, digest)
+
+
+def report_view(request, digest):
+    """Download a rendered report, or 202 while it is still rendering"""
+    from .reports import is_pending, report_path
+    if report_path(digest).is_file():
+        return _report_file_response(digest)
+    if is_pending(digest):
+        return _report_pending_response(request, digest)
+    return JsonResponse({'error': 'Unknown or expired report; request it again from the export URL.'}, status=404)
@@ -1,11 +1,14 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
+from whizzyverse.core.throttling import WriteThrottle
 from .models import ContactMessage
 from .serializers import ContactMessageSerializer
 
 class ContactMessageViewSet(viewsets.ModelViewSet):
     queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
+    throttle_classes = [WriteThrottle]
+    throttle_scope = 'contact'
     
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -7,3 +7,6 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import whizzyverse.core.signals
+        from whizzyverse.core import catalog, search
+        catalog.connect_signals()
+        search.connect_signals()
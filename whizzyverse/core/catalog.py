@@ -0,0 +1,86 @@
+"""
+Change stamps for catalog tables.
+
+Each catalog table has a ``CatalogStamp`` row whose version is bumped on every
+write: saves and deletes through signals, bulk ``update()`` callers through
+``bump()``. Play counts have their own stamp (``PLAYS_STAMP``), so caches that
+don't show plays (WhizBot answers, the retrieval index, facets) aren't rebuilt
+on every play flush.
+
+``stamps(*labels)`` reads current stamps with one primary-key query, for HTTP
+validators that must see other workers' writes at once.
+``catalog_version(model)`` is the same stamp cached in-process for
+``VERSION_TTL`` seconds and dropped as soon as this process writes, so local
+changes are seen immediately and other workers' changes within the TTL.
+"""
+import threading
+import time
+
+from django.apps import apps
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+CATALOG_MODELS = ['tracks.Track', 'events.Event', 'merch.MerchItem']
+PLAYS_STAMP = 'tracks.Track.plays'
+
+VERSION_TTL = 2.0
+
+_versions = {}
+_lock = threading.Lock()
+
+
+def _label(model_or_label):
+    return model_or_label if isinstance(model_or_label, str) else model_or_label._meta.label
+
+
+def stamps(*labels):
+    """``{label: (version, changed_at)}``, read from the database."""
+    from .models import CatalogStamp
+    current = {label: (0, None) for label in labels}
+    for label, version, changed_at in CatalogStamp.objects.filter(label__in=labels).values_list(
+        'label', 'version', 'changed_at'
+    ):
+        current[label] = (version, changed_at)
+    return current
+
+
+def catalog_version(model):
+    """The table's ``(version, changed_at)`` stamp, cached for ``VERSION_TTL`` seconds."""
+    label = _label(model)
+    now = time.monotonic()
+    with _lock:
+        cached = _versions.get(label)
+    if cached and cached[0] > now:
+        return cached[1]
+    version, changed_at = stamps(label)[label]
+    version = (version, changed_at.isoformat() if changed_at else '')
+    with _lock:
+        _versions[label] = (now + VERSION_TTL, version)
+    return version
+
+
+def bump(model, now=None):
+    """Record a write to ``model``'s table (a model or stamp label)."""
+    from .models import CatalogStamp
+    label = _label(model)
+    now = now or timezone.now()
+    if not CatalogStamp.objects.filter(label=label).update(version=F('version') + 1, changed_at=now):
+        CatalogStamp.objects.get_or_create(label=label, defaults={'version': 1, 'changed_at': now})
+    invalidate(label)
+
+
+def invalidate(model):
+    with _lock:
+        _versions.pop(_label(model), None)
+
+
+def _catalog_changed(sender, **kwargs):
+    bump(sender)
+
+
+def connect_signals():
+    for label in CATALOG_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(_catalog_changed, sender=model, dispatch_uid=f'catalog-version-save-{label}')
+        post_delete.connect(_catalog_changed, sender=model, dispatch_uid=f'catalog-version-delete-{label}')
@@ -0,0 +1,116 @@
+"""
+Conditional GET for catalog lists, details and pages.
+
+Validators are cheap: a list or page uses the change stamps (see
+``catalog.stamps``) of the tables it shows, read fresh with one primary-key
+query so other workers' writes are seen at once, and a detail view the row's
+own ``updated_at``. They are hashed together with what else shapes the
+response (path, ``Accept`` header, user and CSRF cookie) into a weak ETag, and
+a request that already has the current one is answered 304 before any
+serialization or template rendering. ``Last-Modified`` is the latest change
+time of those tables or that row.
+
+Track plays are written with ``update()`` and leave ``updated_at`` alone, so
+Track validators also include the plays stamp, and detail ETags the row's play
+count (``VOLATILE``).
+"""
+import hashlib
+from functools import partial, wraps
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .catalog import PLAYS_STAMP, stamps
+
+# Model label -> (field written without touching updated_at, its stamp label)
+VOLATILE = {'tracks.Track': ('plays', PLAYS_STAMP)}
+
+
+def _labels(model):
+    label = model._meta.label
+    return [label, VOLATILE[label][1]] if label in VOLATILE else [label]
+
+
+def list_validators(*models):
+    """``(version, last_modified)`` for a response listing rows of ``models``."""
+    labels = [label for model in models for label in _labels(model)]
+    current = stamps(*labels)
+    version = tuple(current[label][0] for label in labels)
+    return version, max((changed for _, changed in current.values() if changed), default=None)
+
+
+def detail_validators(model, pk):
+    """``(version, last_modified)`` for one row, or ``None`` if there is no such row."""
+    field, stamp = VOLATILE.get(model._meta.label, (None, None))
+    try:
+        row = model._default_manager.filter(pk=pk).values_list('updated_at', *filter(None, [field])).first()
+    except (ValueError, TypeError, ValidationError):
+        return None
+    if row is None:
+        return None
+    last_modified = row[0]
+    if stamp:
+        changed_at = stamps(stamp)[stamp][1]
+        last_modified = max(last_modified, changed_at) if changed_at else last_modified
+    return row, last_modified
+
+
+def make_etag(request, version):
+    user = getattr(request, 'user', None)
+    parts = (
+        version,
+        request.get_full_path(),
+        request.headers.get('Accept', ''),
+        user.pk if user is not None and user.is_authenticated else None,
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    )
+    return f'W/"{hashlib.sha256(repr(parts).encode()).hexdigest()[:32]}"'
+
+
+def respond(request, validators, build):
+    """``build()``'s response with validators attached, or a 304 without calling it."""
+    version, last_modified = validators
+    etag = make_etag(request, version)
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = build()
+        if response.status_code != 200:
+            return response
+    response['ETag'] = etag
+    if timestamp is not None:
+        response['Last-Modified'] = http_date(timestamp)
+    # Cache, but revalidate every time.
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_page(validators):
+    """Decorator answering a page view with 304 when ``validators(request)`` still match."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            return respond(request, validators(request), partial(view, request, *args, **kwargs))
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """Viewset mixin answering ``list`` and ``retrieve`` with 304 when nothing has changed."""
+
+    def get_list_validators(self):
+        return list_validators(self.queryset.model)
+
+    def list(self, request, *args, **kwargs):
+        return respond(request, self.get_list_validators(), partial(super().list, request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        validators = detail_validators(self.queryset.model, pk)
+        if validators is None:
+            return super().retrieve(request, *args, **kwargs)
+        return respond(request, validators, partial(super().retrieve, request, *args, **kwargs))
@@ -0,0 +1,80 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from whizzyverse.core.catalog import bump
+from whizzyverse.tracks.analysis import analyze_track_file
+from whizzyverse.tracks.audio import is_decodable, resolve_media_path
+from whizzyverse.tracks.models import Track
+
+SAVE_BATCH_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = 'Estimate tempo, energy, loudness and brightness for tracks whose audio is under MEDIA_ROOT'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--force', action='store_true', help='Re-analyse even if the audio is unchanged')
+        parser.add_argument('track_ids', nargs='*', type=int)
+
+    def handle(self, *args, **options):
+        tracks = Track.objects.exclude(file_url__isnull=True).exclude(file_url='')
+        if options['track_ids']:
+            tracks = tracks.filter(pk__in=options['track_ids'])
+
+        jobs = {}
+        for track_id, file_url, digest in tracks.values_list('id', 'file_url', 'audio_digest'):
+            path = resolve_media_path(file_url, settings.MEDIA_URL, settings.MEDIA_ROOT)
+            if is_decodable(path):
+                jobs[track_id] = (path, None if options['force'] else digest or None)
+        if not jobs:
+            self.stdout.write('No local WAV files to analyse')
+            return
+
+        # Results are saved in small batches as they arrive, so an interrupted
+        # run resumes where it stopped: finished tracks match on audio_digest.
+        pending = []
+        analysed = skipped = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {
+                pool.submit(analyze_track_file, str(path), digest): track_id
+                for track_id, (path, digest) in jobs.items()
+            }
+            for future in as_completed(futures):
+                track_id = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f'Track {track_id}: {exc}')
+                    continue
+                if result.get('skipped'):
+                    skipped += 1
+                    continue
+                pending.append((track_id, result))
+                analysed += 1
+                if len(pending) >= SAVE_BATCH_SIZE:
+                    self.save(pending)
+                    pending = []
+        self.save(pending)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Analysed {analysed} tracks ({skipped} unchanged, {failed} failed)'
+        ))
+
+    @transaction.atomic
+    def save(self, results):
+        now = timezone.now()
+        for track_id, result in results:
+            Track.objects.filter(pk=track_id).update(
+                audio_digest=result['digest'],
+                analyzed_at=now,
+                updated_at=now,
+                **result['features'],
+            )
+        if results:
+            bump(Track, now)
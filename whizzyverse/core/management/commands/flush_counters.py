@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from whizzyverse.core import write_behind
+
+
+class Command(BaseCommand):
+    help = 'Flush write-behind buffers (track plays, analytics events) and replay spooled batches'
+
+    def handle(self, *args, **options):
+        write_behind.request_flush()
+        self.stdout.write('Requested a flush from running workers')
+
+        for buffer in write_behind.get_buffers():
+            flushed = buffer.flush()
+            replayed = buffer.replay_spool()
+            self.stdout.write(self.style.SUCCESS(
+                f'{buffer.name}: flushed {flushed} buffered writes, replayed {replayed} spooled batches'
+            ))
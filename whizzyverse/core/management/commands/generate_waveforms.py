@@ -0,0 +1,68 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from whizzyverse.tracks.audio import is_decodable, resolve_media_path
+from whizzyverse.tracks.models import Track, TrackWaveform
+from whizzyverse.tracks.waveform import build_waveforms
+
+
+class Command(BaseCommand):
+    help = 'Generate waveform peaks for tracks whose audio file is stored under MEDIA_ROOT'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--force', action='store_true', help='Regenerate even if the audio is unchanged')
+        parser.add_argument('track_ids', nargs='*', type=int)
+
+    def handle(self, *args, **options):
+        tracks = Track.objects.exclude(file_url__isnull=True).exclude(file_url='')
+        if options['track_ids']:
+            tracks = tracks.filter(pk__in=options['track_ids'])
+
+        known = {}
+        if not options['force']:
+            known = dict(TrackWaveform.objects.values_list('track_id', 'source_digest').distinct())
+
+        jobs = {}
+        for track_id, file_url in tracks.values_list('id', 'file_url'):
+            path = resolve_media_path(file_url, settings.MEDIA_URL, settings.MEDIA_ROOT)
+            if is_decodable(path):
+                jobs[track_id] = path
+        if not jobs:
+            self.stdout.write('No local WAV files to process')
+            return
+
+        generated = skipped = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {
+                pool.submit(build_waveforms, str(path), known.get(track_id)): track_id
+                for track_id, path in jobs.items()
+            }
+            for future in as_completed(futures):
+                track_id = futures[future]
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f'Track {track_id}: {exc}')
+                    continue
+                if result.get('skipped'):
+                    skipped += 1
+                    continue
+                self.save(track_id, result)
+                generated += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated peaks for {generated} tracks ({skipped} unchanged, {failed} failed)'
+        ))
+
+    @transaction.atomic
+    def save(self, track_id, result):
+        TrackWaveform.objects.filter(track_id=track_id).delete()
+        TrackWaveform.objects.bulk_create([
+            TrackWaveform(track_id=track_id, source_digest=result['digest'], **waveform)
+            for waveform in result['waveforms']
+        ])
@@ -0,0 +1,17 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connection
+from whizzyverse.core import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search tables for tracks, events and merch'
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write('Full-text search tables are only used with SQLite; nothing to do')
+            return
+
+        for label in search.SEARCH_INDEXES:
+            count = search.rebuild(apps.get_model(label))
+            self.stdout.write(self.style.SUCCESS(f'Indexed {count} rows for {label}'))
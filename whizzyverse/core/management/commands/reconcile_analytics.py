@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from whizzyverse.analytics.models import Analytics
+
+
+class Command(BaseCommand):
+    help = "Recompute today's running analytics totals from the source tables"
+
+    def handle(self, *args, **options):
+        totals = Analytics.reconcile_today()
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled analytics: {totals['track_plays']} track plays, {totals['total_fans']} fans"
+        ))
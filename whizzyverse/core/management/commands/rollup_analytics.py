@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from whizzyverse.analytics.events import event_log
+from whizzyverse.analytics.models import AnalyticsEvent, RollupWatermark
+from whizzyverse.analytics.rollups import WATERMARK, roll_up
+
+
+class Command(BaseCommand):
+    help = 'Fold new analytics events into the hourly and daily rollups'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--prune-days', type=int, default=None,
+            help='Also delete rolled-up raw events older than this many days',
+        )
+
+    def handle(self, *args, **options):
+        event_log.replay_spool()
+        processed = roll_up()
+        self.stdout.write(self.style.SUCCESS(f'Rolled up {processed} events'))
+
+        if options['prune_days'] is not None:
+            watermark = RollupWatermark.objects.filter(name=WATERMARK).values_list('last_event_id', flat=True).first()
+            cutoff = timezone.now() - timedelta(days=options['prune_days'])
+            deleted, _ = AnalyticsEvent.objects.filter(
+                id__lte=watermark or 0, occurred_at__lt=cutoff
+            ).delete()
+            self.stdout.write(f'Pruned {deleted} raw events older than {options["prune_days"]} days')
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from whizzyverse.events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Mark events whose date has passed as past (schedule this, e.g. hourly)'
+
+    def handle(self, *args, **options):
+        changed = Event.objects.sync_is_past()
+        self.stdout.write(self.style.SUCCESS(f'Updated is_past on {changed} events'))
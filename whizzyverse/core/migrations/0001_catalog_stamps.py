@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:58
+
+from django.db import migrations, models
+from django.db.models import Max
+from django.utils import timezone
+
+
+def create_stamps(apps, schema_editor):
+    CatalogStamp = apps.get_model('core', 'CatalogStamp')
+    now = timezone.now()
+    for label in ('tracks.Track', 'events.Event', 'merch.MerchItem'):
+        latest = apps.get_model(label).objects.aggregate(latest=Max('updated_at'))['latest']
+        CatalogStamp.objects.create(label=label, version=1, changed_at=latest or now)
+    CatalogStamp.objects.create(label='tracks.Track.plays', version=1, changed_at=now)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('events', '0003_event_date_coordinates'),
+        ('merch', '0002_merchitem_fts'),
+        ('tracks', '0007_trendingscore'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogStamp',
+            fields=[
+                ('label', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('changed_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.RunPython(create_stamps, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,11 @@
 from django.db import models
 
-# Create your models here.
+
+class CatalogStamp(models.Model):
+    """Change counter for a catalog table (see ``whizzyverse.core.catalog``)."""
+    label = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.label} v{self.version}"
@@ -0,0 +1,80 @@
+"""
+Keyset (cursor) pagination for template views.
+
+Pages are ordered on ``(sort field, id)`` and each page is fetched with a
+``WHERE (field, id) > (last field, last id)`` predicate, so the cost of a page
+does not depend on how deep into the catalog it is. NULL sort values are
+ordered lowest, i.e. first ascending and last descending.
+"""
+import base64
+import json
+
+from django.db.models import F, Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor):
+        self.items = items
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+def encode_cursor(value, pk):
+    payload = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value, pk])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, field):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (None if value is None else field.to_python(value)), int(pk)
+    except Exception as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def _after(name, descending, value, pk):
+    if descending:
+        if value is None:
+            return Q(**{f'{name}__isnull': True, 'id__lt': pk})
+        return Q(**{f'{name}__lt': value}) | Q(**{name: value, 'id__lt': pk}) | Q(**{f'{name}__isnull': True})
+    if value is None:
+        return Q(**{f'{name}__isnull': True, 'id__gt': pk}) | Q(**{f'{name}__isnull': False})
+    return Q(**{f'{name}__gt': value}) | Q(**{name: value, 'id__gt': pk})
+
+
+def paginate_keyset(queryset, sort, fields, cursor=None, page_size=24):
+    """
+    Return one ``KeysetPage`` of ``queryset.values(*fields)`` ordered by ``sort``.
+
+    ``sort`` is a field name, optionally prefixed with ``-``. Raises
+    ``InvalidCursor`` for a cursor that cannot be decoded.
+    """
+    descending = sort.startswith('-')
+    name = sort.lstrip('-')
+    field = queryset.model._meta.get_field(name)
+
+    if descending:
+        queryset = queryset.order_by(F(name).desc(nulls_last=True), '-id')
+    else:
+        queryset = queryset.order_by(F(name).asc(nulls_first=True), 'id')
+
+    if cursor:
+        value, pk = decode_cursor(cursor, field)
+        queryset = queryset.filter(_after(name, descending, value, pk))
+
+    columns = list(dict.fromkeys(['id', name, *fields]))
+    rows = list(queryset.values(*columns)[:page_size + 1])
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1][name], rows[-1]['id'])
+    return KeysetPage(rows, next_cursor)
@@ -0,0 +1,136 @@
+"""
+Full-text search over the catalog backed by SQLite FTS5.
+
+Each indexed model has an FTS5 table named ``<db_table>_fts`` whose rowid is
+the model's primary key. Rows are kept in sync by post_save/post_delete
+handlers; ``manage.py rebuild_search_index`` repopulates the tables after
+bulk changes that bypass signals. On other database backends searches fall
+back to ``icontains`` filters.
+"""
+import re
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from rest_framework import filters
+
+# Model label -> (field, bm25 weight) pairs. Keep in sync with the *_fts migrations.
+SEARCH_INDEXES = {
+    'tracks.Track': [('title', 10.0), ('artist', 2.0), ('genre', 5.0)],
+    'events.Event': [('name', 10.0), ('venue', 5.0), ('city', 5.0), ('description', 1.0)],
+    'merch.MerchItem': [('name', 10.0), ('category', 5.0), ('description', 1.0)],
+}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def is_indexed(model):
+    return model._meta.label in SEARCH_INDEXES and connection.vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """Turn free text into an FTS5 query: every term must match, as a prefix."""
+    terms = TOKEN_RE.findall(text.lower())
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def index_instance(instance):
+    model = type(instance)
+    fields = [name for name, _ in SEARCH_INDEXES[model._meta.label]]
+    columns = ', '.join(fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    values = [getattr(instance, name) or '' for name in fields]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {fts_table(model)} (rowid, {columns}) VALUES (%s, {placeholders})',
+            [instance.pk, *values],
+        )
+
+
+def remove_instance(instance):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {fts_table(type(instance))} WHERE rowid = %s', [instance.pk])
+
+
+def rebuild(model):
+    """Repopulate a model's FTS table from its source table. Returns the row count."""
+    table = fts_table(model)
+    fields = [name for name, _ in SEARCH_INDEXES[model._meta.label]]
+    columns = ', '.join(fields)
+    source = ', '.join(f"COALESCE({name}, '')" for name in fields)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table}')
+        cursor.execute(f'INSERT INTO {table} (rowid, {columns}) SELECT id, {source} FROM {model._meta.db_table}')
+        cursor.execute(f"INSERT INTO {table} ({table}) VALUES ('optimize')")
+    return model.objects.count()
+
+
+def search_queryset(queryset, text, ranked=False):
+    """
+    Filter ``queryset`` to rows matching ``text``.
+
+    With ``ranked=True`` the rows are annotated with ``search_rank`` (bm25, lower
+    is better) and ordered by it.
+    """
+    model = queryset.model
+    match = build_match_query(text)
+    if not match:
+        return queryset
+    if not is_indexed(model):
+        for term in TOKEN_RE.findall(text):
+            condition = Q()
+            for name, _ in SEARCH_INDEXES.get(model._meta.label, []):
+                condition |= Q(**{f'{name}__icontains': term})
+            queryset = queryset.filter(condition)
+        return queryset
+
+    table = fts_table(model)
+    queryset = queryset.filter(pk__in=RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', (match,)))
+    if ranked:
+        weights = ', '.join(str(weight) for _, weight in SEARCH_INDEXES[model._meta.label])
+        rank = RawSQL(
+            f'SELECT bm25({table}, {weights}) FROM {table} '
+            f'WHERE {table} MATCH %s AND {table}.rowid = {model._meta.db_table}.id',
+            (match,),
+        )
+        queryset = queryset.annotate(search_rank=rank).order_by('search_rank', *queryset.query.order_by)
+    return queryset
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """
+    ``SearchFilter`` that answers from the FTS5 index when the model has one.
+
+    List it after ``OrderingFilter`` so results are ranked by relevance unless
+    the client asked for an explicit ``ordering``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        if not is_indexed(queryset.model):
+            return super().filter_queryset(request, queryset, view)
+        text = ' '.join(self.get_search_terms(request))
+        ranked = not request.query_params.get(filters.OrderingFilter.ordering_param)
+        return search_queryset(queryset, text, ranked=ranked)
+
+
+def _index_saved(sender, instance, **kwargs):
+    if is_indexed(sender):
+        index_instance(instance)
+
+
+def _index_deleted(sender, instance, **kwargs):
+    if is_indexed(sender):
+        remove_instance(instance)
+
+
+def connect_signals():
+    for label in SEARCH_INDEXES:
+        model = apps.get_model(label)
+        post_save.connect(_index_saved, sender=model, dispatch_uid=f'search-index-save-{label}')
+        post_delete.connect(_index_deleted, sender=model, dispatch_uid=f'search-index-delete-{label}')
@@ -1,24 +1,26 @@
-from django.db import models
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
+from whizzyverse.tracks.signals import plays_flushed
 
 
-@receiver(post_save, sender='tracks.Track')
-def track_engagement_on_play(sender, instance, created, **kwargs):
-    """Track play count changes in analytics"""
-    if not created:
-        from whizzyverse.analytics.models import Analytics
-        analytics = Analytics.get_or_create_today()
-        total_plays = sender.objects.aggregate(total=models.Sum('plays'))['total'] or 0
-        analytics.track_plays = total_plays
-        analytics.save()
+@receiver(plays_flushed)
+def track_engagement_on_play(sender, counts, **kwargs):
+    """Add flushed plays to today's analytics"""
+    from whizzyverse.analytics.models import Analytics
+    Analytics.apply_deltas(track_plays=sum(counts.values()))
 
 
 @receiver(post_save, sender='newsletter.NewsletterSubscriber')
 def track_newsletter_signups(sender, instance, created, **kwargs):
     """Track newsletter signups"""
-    if created:
+    if created and instance.is_active:
+        from whizzyverse.analytics.models import Analytics
+        Analytics.apply_deltas(total_fans=1)
+
+
+@receiver(post_delete, sender='newsletter.NewsletterSubscriber')
+def track_newsletter_removals(sender, instance, **kwargs):
+    """Track deleted subscribers"""
+    if instance.is_active:
         from whizzyverse.analytics.models import Analytics
-        analytics = Analytics.get_or_create_today()
-        analytics.total_fans = sender.objects.filter(is_active=True).count()
-        analytics.save()
+        Analytics.apply_deltas(total_fans=-1)
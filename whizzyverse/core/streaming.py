@@ -0,0 +1,222 @@
+"""
+HTTP Range support for serving local media files.
+
+Full and single-range responses are ``FileResponse`` objects: a range is
+handed over as a file positioned at the range start plus a Content-Length.
+Under a WSGI server with ``wsgi.file_wrapper`` (gunicorn) that is sent with
+``sendfile``. Under ASGI (uvicorn, as deployed) there is no file wrapper and
+Django reads and sends the file in chunks from Python, so production media
+should be offloaded: if ``MEDIA_ACCEL_REDIRECT_PREFIX`` or
+``MEDIA_USE_X_SENDFILE`` is set, the transfer is delegated to the front proxy
+(nginx ``X-Accel-Redirect``, Apache/lighttpd ``X-Sendfile``), which then
+handles ranges itself. Multi-range requests get a ``multipart/byteranges``
+body.
+"""
+import io
+import mimetypes
+import os
+import re
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+MAX_RANGES = 16
+BLOCK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r'^\s*(\d*)\s*-\s*(\d*)\s*$')
+
+
+def parse_range_header(header, size):
+    """
+    Parse a ``Range`` header into sorted, merged ``(start, end)`` inclusive pairs.
+
+    Returns None when the header should be ignored (missing, malformed, not
+    bytes, or too many ranges) and ``[]`` when no range is satisfiable.
+    """
+    if not header or '=' not in header:
+        return None
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes':
+        return None
+    ranges = []
+    for part in spec.split(','):
+        match = RANGE_RE.match(part)
+        if not match or match.groups() == ('', ''):
+            return None
+        first, last = match.groups()
+        if first == '':
+            length = int(last)
+            if length == 0:
+                continue
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(first)
+            end = min(int(last), size - 1) if last else size - 1
+            if last and int(last) < start:
+                return None
+            if start >= size:
+                continue
+        ranges.append((start, end))
+    if len(ranges) > MAX_RANGES:
+        return None
+
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class FileRange:
+    """A file restricted to ``[start, start + length)``, positioned at ``start``."""
+
+    def __init__(self, file, start, length):
+        self._file = file
+        self._end = start + length
+        self.name = file.name
+        file.seek(start)
+
+    def read(self, size=-1):
+        remaining = self._end - self._file.tell()
+        if remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        return self._file.read(size)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_END:
+            return self._file.seek(self._end + offset)
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def seekable(self):
+        return True
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def close(self):
+        self._file.close()
+
+
+def _multipart_ranges(path, ranges, size, content_type, boundary):
+    with open(path, 'rb') as f:
+        for start, end in ranges:
+            yield (
+                f'--{boundary}\r\nContent-Type: {content_type}\r\n'
+                f'Content-Range: bytes {start}-{end}/{size}\r\n\r\n'
+            ).encode()
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                block = f.read(min(BLOCK_SIZE, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                yield block
+            yield b'\r\n'
+    yield f'--{boundary}--\r\n'.encode()
+
+
+def _multipart_length(ranges, size, content_type, boundary):
+    length = len(f'--{boundary}--\r\n')
+    for start, end in ranges:
+        length += len(
+            f'--{boundary}\r\nContent-Type: {content_type}\r\n'
+            f'Content-Range: bytes {start}-{end}/{size}\r\n\r\n'
+        ) + (end - start + 1) + 2
+    return length
+
+
+def _if_range_matches(request, etag, mtime):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    # Weak ETags never match If-Range; dates must be an exact match.
+    if if_range.startswith('W/'):
+        return False
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+def _delegated_response(path, root, content_type):
+    relative = Path(path).relative_to(Path(root).resolve()).as_posix()
+    response = HttpResponse(content_type=content_type)
+    accel_prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', None)
+    if accel_prefix:
+        response['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + relative
+    else:
+        response['X-Sendfile'] = str(path)
+    return response
+
+
+def serve_file(request, root, relative_path):
+    """Serve ``relative_path`` under ``root`` with conditional and Range support."""
+    try:
+        path = Path(safe_join(os.fspath(root), relative_path)).resolve()
+    except SuspiciousFileOperation:
+        raise Http404('Invalid media path')
+    if not path.is_file():
+        raise Http404('Media file not found')
+
+    stat = path.stat()
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    content_type = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+
+    response = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        if getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', None) or getattr(settings, 'MEDIA_USE_X_SENDFILE', False):
+            response = _delegated_response(path, root, content_type)
+        else:
+            response = _build_response(request, path, size, content_type, etag, stat.st_mtime)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _build_response(request, path, size, content_type, etag, mtime):
+    ranges = None
+    if _if_range_matches(request, etag, mtime):
+        ranges = parse_range_header(request.META.get('HTTP_RANGE'), size)
+
+    if ranges == []:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+        response['Content-Length'] = str(size)
+        return response
+
+    if ranges is None:
+        return FileResponse(open(path, 'rb'), content_type=content_type)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        response = FileResponse(FileRange(open(path, 'rb'), start, end - start + 1), content_type=content_type)
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        return response
+
+    boundary = uuid.uuid4().hex
+    response = StreamingHttpResponse(
+        _multipart_ranges(path, ranges, size, content_type, boundary),
+        status=206,
+        content_type=f'multipart/byteranges; boundary={boundary}',
+    )
+    response['Content-Length'] = str(_multipart_length(ranges, size, content_type, boundary))
+    return response
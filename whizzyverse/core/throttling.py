@@ -0,0 +1,178 @@
+"""
+Token-bucket rate limiting.
+
+Each policy in ``RATE_LIMITS`` refills a client's bucket at ``RATE`` (for
+example ``'6/min'``) up to ``BURST`` tokens, and every request takes one. A
+client is identified by IP address or, with ``'KEY': 'session'``, by session
+when it has one. The address is ``REMOTE_ADDR`` unless DRF's ``NUM_PROXIES``
+says how many trusted proxies append to ``X-Forwarded-For``; the header is
+never trusted otherwise, since clients can set it to anything.
+
+Buckets are kept in process memory, bounded to ``MAX_LOCAL_BUCKETS`` with the
+least recently used dropped first. Set ``RATE_LIMIT_CACHE`` to a cache alias
+backed by a shared store (Redis, Memcached) to enforce limits across worker
+processes; concurrent requests from one client may then slip an extra token
+through, since the cache update is not atomic.
+
+DRF views use ``TokenBucketThrottle`` (or ``WriteThrottle``) with a
+``throttle_scope``; plain Django views use the ``rate_limit`` decorator. Both
+answer 429 with ``Retry-After`` before the view runs.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'sec': 1, 'second': 1, 'm': 60, 'min': 60, 'minute': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+MAX_LOCAL_BUCKETS = 10000
+
+Policy = namedtuple('Policy', ['scope', 'per_second', 'burst', 'key'])
+
+
+def parse_rate(rate):
+    """``'10/min'`` -> tokens per second."""
+    count, _, period = rate.partition('/')
+    return int(count) / PERIODS[period.strip().lower()]
+
+
+def get_policy(scope):
+    options = getattr(settings, 'RATE_LIMITS', {}).get(scope)
+    if not options:
+        return None
+    per_second = parse_rate(options['RATE'])
+    return Policy(scope, per_second, options.get('BURST', max(1, math.ceil(per_second))), options.get('KEY', 'ip'))
+
+
+def _refill(state, policy, now):
+    tokens, stamp = state if state else (policy.burst, now)
+    return min(policy.burst, tokens + (now - stamp) * policy.per_second)
+
+
+def _take(tokens, policy):
+    """Return ``(tokens left, seconds to wait)`` after trying to take one token."""
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / policy.per_second
+
+
+class LocalBuckets:
+    def __init__(self, max_buckets=MAX_LOCAL_BUCKETS):
+        self.max_buckets = max_buckets
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+
+    def take(self, key, policy):
+        now = time.monotonic()
+        with self._lock:
+            tokens, wait = _take(_refill(self._buckets.pop(key, None), policy, now), policy)
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class CacheBuckets:
+    def __init__(self, alias):
+        self.cache = caches[alias]
+
+    def take(self, key, policy):
+        now = time.time()
+        cache_key = f'ratelimit:{key}'
+        tokens, wait = _take(_refill(self.cache.get(cache_key), policy, now), policy)
+        # Once the bucket would be full again the entry can go.
+        self.cache.set(cache_key, (tokens, now), timeout=math.ceil(policy.burst / policy.per_second) + 1)
+        return wait
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def bucket_store():
+    global _store
+    alias = getattr(settings, 'RATE_LIMIT_CACHE', '')
+    with _store_lock:
+        if _store is None or getattr(_store, 'alias', '') != alias:
+            _store = CacheBuckets(alias) if alias else LocalBuckets()
+            _store.alias = alias
+        return _store
+
+
+def client_ip(request):
+    if api_settings.NUM_PROXIES:
+        return BaseThrottle().get_ident(request)
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def client_key(request, policy):
+    if policy.key == 'session':
+        session = getattr(request, 'session', None)
+        if session is not None and session.session_key:
+            return f'{policy.scope}:session:{session.session_key}'
+    return f'{policy.scope}:ip:{client_ip(request)}'
+
+
+def check(scope, request):
+    """Take a token for ``request`` under ``scope``. Returns 0, or the seconds to wait."""
+    policy = get_policy(scope)
+    if policy is None:
+        return 0.0
+    return bucket_store().take(client_key(request, policy), policy)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Applies the ``RATE_LIMITS`` policy named by ``scope``, or else by the view's ``throttle_scope``."""
+    scope = None
+
+    def allow_request(self, request, view):
+        self._wait = check(self.scope or getattr(view, 'throttle_scope', None), request)
+        return not self._wait
+
+    def wait(self):
+        return self._wait
+
+
+class WriteThrottle(TokenBucketThrottle):
+    """Like ``TokenBucketThrottle``, but reads are not limited."""
+
+    def allow_request(self, request, view):
+        if request.method in SAFE_METHODS:
+            return True
+        return super().allow_request(request, view)
+
+
+def too_many_requests(wait):
+    retry_after = max(1, math.ceil(wait))
+    response = JsonResponse({'detail': f'Request was throttled. Expected available in {retry_after} seconds.'}, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limit(scope):
+    """Decorator applying a ``RATE_LIMITS`` policy to a Django view, sync or async."""
+    def decorator(view):
+        if iscoroutinefunction(view):
+            async def wrapper(request, *args, **kwargs):
+                # A cache-backed store may do blocking I/O.
+                wait = await sync_to_async(check)(scope, request)
+                if wait:
+                    return too_many_requests(wait)
+                return await view(request, *args, **kwargs)
+            markcoroutinefunction(wrapper)
+        else:
+            def wrapper(request, *args, **kwargs):
+                wait = check(scope, request)
+                if wait:
+                    return too_many_requests(wait)
+                return view(request, *args, **kwargs)
+        return wraps(view)(wrapper)
+    return decorator
@@ -1,12 +1,22 @@
+from django.conf import settings
 from django.shortcuts import render
+from django.views.decorators.http import require_safe
+from whizzyverse.core.conditional import conditional_page
+from whizzyverse.core.streaming import serve_file
 from whizzyverse.tracks.models import Track
 from whizzyverse.events.models import Event
+from whizzyverse.events.views import schedule_validators
 from whizzyverse.merch.models import MerchItem
 
 
+def landing_validators(request):
+    return schedule_validators(Track, MerchItem)
+
+
+@conditional_page(landing_validators)
 def landing_page_view(request):
     featured_tracks = Track.objects.filter(featured=True)[:3]
-    upcoming_events = Event.objects.filter(is_past=False).order_by('date')[:3]
+    upcoming_events = Event.objects.upcoming()[:3]
     featured_merch = MerchItem.objects.filter(featured=True, is_available=True)[:3]
     
     return render(request, 'core/landing.html', {
@@ -18,3 +28,9 @@ def landing_page_view(request):
 
 def favorites_view(request):
     return render(request, 'core/favorites.html')
+
+
+@require_safe
+def media_stream_view(request, path):
+    """Serve uploaded media (track audio) with Range and conditional request support"""
+    return serve_file(request, settings.MEDIA_ROOT, path)
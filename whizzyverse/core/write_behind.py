@@ -0,0 +1,226 @@
+"""
+Write-behind buffers for hot counters.
+
+A buffer folds writes into process memory and applies them to the database in
+batches: when the batch reaches ``FLUSH_THRESHOLD`` items, every
+``FLUSH_INTERVAL`` seconds, and once more when the process exits. Batches that
+cannot be written (locked database, shutdown without a database) are spooled to
+``WRITE_BEHIND_SPOOL_DIR`` as JSON and replayed by the next successful flush or
+by ``manage.py flush_counters``. A replaying process claims a file by renaming
+it with its pid; files left claimed by a process that has since died are
+claimed again, so a crash mid-replay does not lose the batch.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+FLUSH_REQUEST_FILE = 'flush.request'
+
+_buffers = {}
+_buffers_lock = threading.Lock()
+_flusher = None
+_flusher_pid = None
+_wake = threading.Event()
+
+
+def spool_dir():
+    return Path(getattr(settings, 'WRITE_BEHIND_SPOOL_DIR', Path(settings.BASE_DIR) / 'var' / 'spool'))
+
+
+class WriteBehindBuffer:
+    """
+    Base class for a named write-behind buffer.
+
+    Subclasses implement ``merge(pending, item)`` to fold one write into the
+    pending batch and ``apply(batch)`` to persist a drained batch. ``dump`` and
+    ``load`` convert a batch to and from JSON for the spool.
+    """
+    name = None
+    flush_interval = 5.0
+    flush_threshold = 500
+
+    def __init__(self):
+        options = getattr(settings, 'WRITE_BEHIND_BUFFERS', {}).get(self.name, {})
+        self.flush_interval = options.get('FLUSH_INTERVAL', self.flush_interval)
+        self.flush_threshold = options.get('FLUSH_THRESHOLD', self.flush_threshold)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = self.empty()
+        self._size = 0
+        self._last_flush = time.monotonic()
+        register(self)
+
+    def empty(self):
+        return {}
+
+    def merge(self, pending, item):
+        raise NotImplementedError
+
+    def apply(self, batch):
+        raise NotImplementedError
+
+    def dump(self, batch):
+        return batch
+
+    def load(self, data):
+        return data
+
+    def add(self, item):
+        with self._lock:
+            self.merge(self._pending, item)
+            self._size += 1
+            full = self._size >= self.flush_threshold
+        _ensure_flusher()
+        if full:
+            _wake.set()
+
+    def due(self, now):
+        return self._size and now - self._last_flush >= self.flush_interval
+
+    def drain(self):
+        with self._lock:
+            batch, self._pending = self._pending, self.empty()
+            self._size = 0
+        return batch
+
+    def flush(self):
+        """Write the pending batch. Returns the number of buffered writes applied."""
+        with self._flush_lock:
+            size = self._size
+            batch = self.drain()
+            self._last_flush = time.monotonic()
+            if not batch:
+                return 0
+            try:
+                self.apply(batch)
+            except Exception:
+                logger.exception('Flushing write-behind buffer %r failed; spooling batch', self.name)
+                self.spool(batch)
+                return 0
+            return size
+
+    def spool(self, batch):
+        directory = spool_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{self.name}-{os.getpid()}-{uuid.uuid4().hex}.json'
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps(self.dump(batch)))
+        os.replace(tmp, path)
+
+    def replay_spool(self):
+        """Apply spooled batches for this buffer. Returns the number of files replayed."""
+        directory = spool_dir()
+        if not directory.is_dir():
+            return 0
+        replayed = 0
+        orphaned = [path for path in directory.glob(f'{self.name}-*.json.*.claimed') if not _claim_is_live(path)]
+        for path in sorted(directory.glob(f'{self.name}-*.json')) + sorted(orphaned):
+            spooled = directory / (path.name.partition('.json')[0] + '.json')
+            claimed = directory / f'{spooled.name}.{os.getpid()}.claimed'
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue  # another process claimed it first
+            try:
+                self.apply(self.load(json.loads(claimed.read_text())))
+            except Exception:
+                logger.exception('Replaying spooled batch %s failed', spooled.name)
+                os.rename(claimed, spooled)
+                continue
+            claimed.unlink()
+            replayed += 1
+        return replayed
+
+
+def _claim_is_live(path):
+    """Whether the process named in a ``.claimed`` spool file is still running."""
+    try:
+        pid = int(path.name.rsplit('.', 2)[1])
+    except ValueError:
+        return False
+    if pid == os.getpid():
+        return True  # another thread here is replaying it
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # exists, but owned by another user
+    return True
+
+
+def register(buffer):
+    with _buffers_lock:
+        _buffers[buffer.name] = buffer
+
+
+def get_buffers():
+    with _buffers_lock:
+        return list(_buffers.values())
+
+
+def request_flush():
+    """Ask running workers to flush on their next flusher tick."""
+    directory = spool_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / FLUSH_REQUEST_FILE).write_text(str(time.time()))
+
+
+def _flush_requested_at():
+    try:
+        return os.stat(spool_dir() / FLUSH_REQUEST_FILE).st_mtime
+    except OSError:
+        return 0
+
+
+def _run_flusher():
+    seen_request = _flush_requested_at()
+    while True:
+        _wake.wait(1.0)
+        _wake.clear()
+        requested = _flush_requested_at()
+        forced = requested > seen_request
+        seen_request = max(seen_request, requested)
+        now = time.monotonic()
+        try:
+            for buffer in get_buffers():
+                if forced or buffer.due(now) or buffer._size >= buffer.flush_threshold:
+                    if buffer.flush():
+                        buffer.replay_spool()
+        finally:
+            connections.close_all()
+
+
+def _ensure_flusher():
+    global _flusher, _flusher_pid
+    # Workers forked from a preloaded master inherit a dead thread handle.
+    if _flusher is not None and _flusher_pid == os.getpid() and _flusher.is_alive():
+        return
+    with _buffers_lock:
+        if _flusher is not None and _flusher_pid == os.getpid() and _flusher.is_alive():
+            return
+        _flusher_pid = os.getpid()
+        _flusher = threading.Thread(target=_run_flusher, name='write-behind-flusher', daemon=True)
+        _flusher.start()
+
+
+@atexit.register
+def _flush_on_shutdown():
+    for buffer in get_buffers():
+        batch = buffer.drain()
+        if not batch:
+            continue
+        try:
+            buffer.apply(batch)
+        except Exception:
+            buffer.spool(batch)
@@ -7,6 +7,5 @@ class EventAdmin(admin.ModelAdmin):
     list_display = ['name', 'date', 'venue', 'city', 'is_past', 'created_at']
     list_filter = ['is_past', 'city', 'date']
     search_fields = ['name', 'venue', 'city']
-    list_editable = ['is_past']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['is_past', 'created_at', 'updated_at']
     date_hierarchy = 'date'
@@ -0,0 +1,37 @@
+"""
+Great-circle distances for "events near me".
+
+``bounding_box`` gives the latitude range and the longitude range(s) that
+contain every point within a radius, so the indexed coordinates can narrow
+the candidates before ``haversine_km`` checks each one exactly. Near the poles
+the box widens to every longitude; across the antimeridian it is split in two.
+"""
+import math
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(latitude1, longitude1, latitude2, longitude2):
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(longitude2 - longitude1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """``(min latitude, max latitude, [(min longitude, max longitude), ...])``"""
+    angle = radius_km / EARTH_RADIUS_KM
+    min_latitude = latitude - math.degrees(angle)
+    max_latitude = latitude + math.degrees(angle)
+    if min_latitude <= -90 or max_latitude >= 90:
+        return max(min_latitude, -90.0), min(max_latitude, 90.0), [(-180.0, 180.0)]
+
+    # Widest longitude span of the circle, at the latitude where it touches the box.
+    d_longitude = math.degrees(math.asin(math.sin(angle) / math.cos(math.radians(latitude))))
+    west, east = longitude - d_longitude, longitude + d_longitude
+    if west < -180:
+        return min_latitude, max_latitude, [(west + 360, 180.0), (-180.0, east)]
+    if east > 180:
+        return min_latitude, max_latitude, [(west, 180.0), (-180.0, east - 360)]
+    return min_latitude, max_latitude, [(west, east)]
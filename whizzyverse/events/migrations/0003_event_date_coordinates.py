@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:45
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def sync_is_past(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    now = timezone.now()
+    Event.objects.filter(date__lt=now).update(is_past=True)
+    Event.objects.filter(date__gte=now).update(is_past=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_event_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='date',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='is_past',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['latitude', 'longitude'], name='events_even_latitud_fbe0e6_idx'),
+        ),
+        migrations.RunPython(sync_is_past, migrations.RunPython.noop),
+    ]
@@ -1,23 +1,73 @@
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+from whizzyverse.core.catalog import bump
+from .geo import bounding_box
+
+
+class EventQuerySet(models.QuerySet):
+    def upcoming(self, now=None):
+        return self.filter(date__gte=now or timezone.now()).order_by('date')
+
+    def past(self, now=None):
+        return self.filter(date__lt=now or timezone.now()).order_by('-date')
+
+    def within_box(self, latitude, longitude, radius_km):
+        """Events inside the bounding box of a circle; callers check the exact distance."""
+        min_latitude, max_latitude, longitude_ranges = bounding_box(latitude, longitude, radius_km)
+        in_longitude = Q()
+        for low, high in longitude_ranges:
+            in_longitude |= Q(longitude__gte=low, longitude__lte=high)
+        return self.filter(in_longitude, latitude__gte=min_latitude, latitude__lte=max_latitude)
+
+    def sync_is_past(self, now=None):
+        """Flag events whose date has passed (or been moved ahead). Returns the rows changed."""
+        now = now or timezone.now()
+        passed = self.filter(is_past=False, date__lt=now).update(is_past=True, updated_at=now)
+        rescheduled = self.filter(is_past=True, date__gte=now).update(is_past=False, updated_at=now)
+        if passed or rescheduled:
+            bump(self.model, now)
+        return passed + rescheduled
 
 
 class Event(models.Model):
     name = models.CharField(max_length=200)
-    date = models.DateTimeField()
+    date = models.DateTimeField(db_index=True)
     venue = models.CharField(max_length=200)
     city = models.CharField(max_length=100)
     country = models.CharField(max_length=100, default='USA')
+    latitude = models.FloatField(blank=True, null=True)
+    longitude = models.FloatField(blank=True, null=True)
     banner = models.URLField(max_length=500, blank=True, null=True)
     description = models.TextField(blank=True, null=True)
     ticket_url = models.URLField(max_length=500, blank=True, null=True)
     ticket_price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
     capacity = models.IntegerField(blank=True, null=True)
-    is_past = models.BooleanField(default=False)
+    # Derived from `date` on save and kept current by `manage.py sync_event_status`.
+    is_past = models.BooleanField(default=False, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = EventQuerySet.as_manager()
+
     class Meta:
         ordering = ['-date']
+        indexes = [
+            models.Index(fields=['latitude', 'longitude']),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.venue}, {self.city}"
+
+    def save(self, *args, **kwargs):
+        # `date` may still be a string, e.g. when created from seed JSON.
+        date = self._meta.get_field('date').to_python(self.date)
+        if date is not None:
+            if timezone.is_naive(date):
+                date = timezone.make_aware(date)
+            self.is_past = date < timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'date' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'is_past'}
+        super().save(*args, **kwargs)
@@ -1,63 +1,141 @@
+import math
+import threading
+
 from django.shortcuts import render
-from django.db.models import Q
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from whizzyverse.core.catalog import catalog_version
+from whizzyverse.core.conditional import ConditionalGetMixin, conditional_page, list_validators
+from whizzyverse.core.search import FullTextSearchFilter, search_queryset
+from .geo import haversine_km
 from .models import Event
 from .serializers import EventSerializer
 
+NEARBY_RADIUS_KM = 100
+MAX_NEARBY_RADIUS_KM = 2000
+MAX_NEARBY_RESULTS = 50
+PAST_EVENTS_SHOWN = 24
+
+
+def schedule_validators(*models):
+    """
+    Validators for a response listing events (and rows of ``models``). It also
+    changes when a show passes, which is not a write, at that show's date.
+    """
+    version, last_modified = list_validators(Event, *models)
+    last_passed = Event.objects.past().values_list('date', flat=True).first()
+    if last_passed and last_modified:
+        last_modified = max(last_modified, last_passed)
+    return (version, last_passed), last_modified
 
-class EventViewSet(viewsets.ReadOnlyModelViewSet):
+
+class EventViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Event.objects.all()
     serializer_class = EventSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'venue', 'city', 'description']
-    ordering_fields = ['title', 'date']
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
+    search_fields = ['name', 'venue', 'city', 'description']
+    ordering_fields = ['name', 'date']
     ordering = ['date']
-    
+
     def get_queryset(self):
         queryset = Event.objects.all()
         city = self.request.query_params.get('city', None)
         upcoming = self.request.query_params.get('upcoming', None)
-        
+
         if city:
             queryset = queryset.filter(city__icontains=city)
         if upcoming == 'true':
-            queryset = queryset.filter(is_past=False)
-        
+            queryset = queryset.upcoming()
+
         return queryset
 
+    def get_list_validators(self):
+        return schedule_validators()
+
+    @action(detail=False, methods=['get'])
+    def nearby(self, request):
+        params = request.query_params
+        try:
+            latitude = float(params['lat'])
+            longitude = float(params['lng'])
+        except (KeyError, ValueError):
+            return Response({'error': 'lat and lng are required'}, status=400)
+        if not (math.isfinite(latitude) and math.isfinite(longitude)
+                and -90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return Response({'error': 'lat must be within ±90 and lng within ±180'}, status=400)
+        try:
+            radius = float(params.get('radius', NEARBY_RADIUS_KM))
+        except ValueError:
+            radius = NEARBY_RADIUS_KM
+        if not math.isfinite(radius):
+            radius = NEARBY_RADIUS_KM
+        radius = min(max(radius, 1), MAX_NEARBY_RADIUS_KM)
+        try:
+            limit = min(max(int(params.get('limit', 10)), 1), MAX_NEARBY_RESULTS)
+        except ValueError:
+            limit = 10
+
+        candidates = Event.objects.within_box(latitude, longitude, radius)
+        if params.get('upcoming', 'true') != 'false':
+            candidates = candidates.upcoming()
+        nearby = []
+        for event in candidates:
+            distance = haversine_km(latitude, longitude, event.latitude, event.longitude)
+            if distance <= radius:
+                nearby.append((distance, event))
+        nearby.sort(key=lambda pair: pair[0])
+
+        results = []
+        for distance, event in nearby[:limit]:
+            data = self.get_serializer(event).data
+            data['distance_km'] = round(distance, 1)
+            results.append(data)
+        return Response({'radius_km': radius, 'events': results})
 
+
+_cities = (None, [])
+_cities_lock = threading.Lock()
+
+
+def event_cities():
+    """Distinct event cities for the filter menu, recomputed when the events change."""
+    global _cities
+    version = catalog_version(Event)
+    with _cities_lock:
+        if _cities[0] == version:
+            return _cities[1]
+    cities = list(Event.objects.order_by('city').values_list('city', flat=True).distinct())
+    with _cities_lock:
+        _cities = (version, cities)
+    return cities
+
+
+@conditional_page(lambda request: schedule_validators())
 def events_view(request):
     search_query = request.GET.get('search', '')
     city_filter = request.GET.get('city', '')
     view_filter = request.GET.get('view', 'upcoming')
-    
-    upcoming_events = Event.objects.filter(is_past=False).order_by('date')
-    past_events = Event.objects.filter(is_past=True).order_by('-date')
-    
+
+    upcoming_events = Event.objects.upcoming()
+    past_events = Event.objects.past()
+
     if search_query:
-        upcoming_events = upcoming_events.filter(
-            Q(title__icontains=search_query) |
-            Q(venue__icontains=search_query) |
-            Q(city__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
-        past_events = past_events.filter(
-            Q(title__icontains=search_query) |
-            Q(venue__icontains=search_query) |
-            Q(city__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
-    
+        upcoming_events = search_queryset(upcoming_events, search_query)
+        past_events = search_queryset(past_events, search_query)
+
     if city_filter:
         upcoming_events = upcoming_events.filter(city__icontains=city_filter)
         past_events = past_events.filter(city__icontains=city_filter)
-    
-    all_cities = Event.objects.values_list('city', flat=True).distinct()
-    
+
+    upcoming_events = list(upcoming_events)
+
     return render(request, 'events/events.html', {
         'upcoming_events': upcoming_events,
-        'past_events': past_events,
-        'all_cities': all_cities,
+        'next_event': upcoming_events[0] if upcoming_events else None,
+        # Most recent first; older shows can still be found by search or city.
+        'past_events': past_events[:PAST_EVENTS_SHOWN],
+        'all_cities': event_cities(),
         'search_query': search_query,
         'city_filter': city_filter,
         'view_filter': view_filter,
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+TABLE = 'merch_merchitem_fts'
+SOURCE = 'merch_merchitem'
+COLUMNS = ['name', 'category', 'description']
+
+
+def create_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    columns = ', '.join(COLUMNS)
+    source = ', '.join(f"COALESCE({name}, '')" for name in COLUMNS)
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5({columns}, tokenize='unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(f'INSERT INTO {TABLE} (rowid, {columns}) SELECT id, {source} FROM {SOURCE}')
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('merch', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -1,14 +1,15 @@
 from django.shortcuts import render
-from django.db.models import Q
 from rest_framework import viewsets, filters
+from whizzyverse.core.conditional import ConditionalGetMixin, conditional_page, list_validators
+from whizzyverse.core.search import FullTextSearchFilter, search_queryset
 from .models import MerchItem
 from .serializers import MerchItemSerializer
 
 
-class MerchItemViewSet(viewsets.ReadOnlyModelViewSet):
+class MerchItemViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = MerchItem.objects.all()
     serializer_class = MerchItemSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.OrderingFilter, FullTextSearchFilter]
     search_fields = ['name', 'category', 'description']
     ordering_fields = ['name', 'price']
     ordering = ['name']
@@ -29,6 +30,7 @@ class MerchItemViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
+@conditional_page(lambda request: list_validators(MerchItem))
 def merch_store_view(request):
     search_query = request.GET.get('search', '')
     category_filter = request.GET.get('category', '')
@@ -37,11 +39,7 @@ def merch_store_view(request):
     merch_items = MerchItem.objects.filter(is_available=True)
     
     if search_query:
-        merch_items = merch_items.filter(
-            Q(name__icontains=search_query) |
-            Q(category__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
+        merch_items = search_queryset(merch_items, search_query)
     
     if category_filter:
         merch_items = merch_items.filter(category__icontains=category_filter)
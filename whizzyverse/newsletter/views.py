@@ -1,12 +1,15 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from whizzyverse.core.throttling import WriteThrottle
 from .models import NewsletterSubscriber
 from .serializers import NewsletterSubscriberSerializer
 
 class NewsletterSubscriberViewSet(viewsets.ModelViewSet):
     queryset = NewsletterSubscriber.objects.all()
     serializer_class = NewsletterSubscriberSerializer
+    throttle_classes = [WriteThrottle]
+    throttle_scope = 'newsletter'
     
     def create(self, request, *args, **kwargs):
         email = request.data.get('email')
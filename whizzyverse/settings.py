@@ -62,6 +62,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'whizzyverse.analytics.middleware.ViewCountingMiddleware',
 ]
 
 ROOT_URLCONF = 'whizzyverse.urls'
@@ -140,6 +141,12 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Hand media transfers to the front proxy instead of the app server, e.g. an
+# nginx `internal` location mapped to MEDIA_ROOT ('/protected-media/'), or
+# X-Sendfile for Apache/lighttpd.
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '')
+MEDIA_USE_X_SENDFILE = os.getenv('MEDIA_USE_X_SENDFILE', '') == 'True'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -156,6 +163,9 @@ CORS_ALLOW_CREDENTIALS = True
 
 # Django REST Framework
 REST_FRAMEWORK = {
+    # Trusted reverse proxies in front of the app (1 behind a single load balancer).
+    # With 0, X-Forwarded-For is ignored and clients are told apart by REMOTE_ADDR.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', '0')),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
@@ -168,6 +178,58 @@ REST_FRAMEWORK = {
 # OpenAI Configuration
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 
+# WhizBot answer cache (whizzyverse/ai_connector/cache.py)
+WHIZBOT_RESPONSE_CACHE = {
+    'MAX_ENTRIES': 512,
+    'TTL': 3600,
+    'SIMILARITY': 0.8,
+}
+
+# WhizBot completion calls (whizzyverse/ai_connector/llm.py)
+WHIZBOT_LLM = {
+    'MAX_CONCURRENT': int(os.getenv('WHIZBOT_MAX_CONCURRENT', '8')),
+    'QUEUE_TIMEOUT': 2.0,
+    'DEADLINE': 30.0,
+    'FAILURE_THRESHOLD': 5,
+    'COOLDOWN': 30.0,
+}
+
+# WhizBot conversation memory per chat session (whizzyverse/ai_connector/memory.py)
+WHIZBOT_MEMORY = {
+    'MAX_SESSIONS': 1000,
+    'MAX_TURNS': 12,
+    'IDLE_TIMEOUT': 1800,
+    'HISTORY_TOKENS': 1200,
+}
+
+# Write-behind counters (whizzyverse/core/write_behind.py)
+WRITE_BEHIND_SPOOL_DIR = BASE_DIR / 'var' / 'spool'
+WRITE_BEHIND_BUFFERS = {
+    'plays': {'FLUSH_INTERVAL': 5, 'FLUSH_THRESHOLD': 500},
+    'events': {'FLUSH_INTERVAL': 10, 'FLUSH_THRESHOLD': 1000},
+    'views': {'FLUSH_INTERVAL': 10, 'FLUSH_THRESHOLD': 1000},
+    'uniques': {'FLUSH_INTERVAL': 10, 'FLUSH_THRESHOLD': 1000},
+}
+
+# Token-bucket rate limits per client and endpoint (whizzyverse/core/throttling.py).
+# RATE is the refill rate, BURST the bucket size; KEY is 'ip' or 'session'.
+RATE_LIMITS = {
+    'chat': {'RATE': '10/min', 'BURST': 5},
+    'play': {'RATE': '30/min', 'BURST': 10},
+    'newsletter': {'RATE': '5/hour', 'BURST': 3},
+    'contact': {'RATE': '5/hour', 'BURST': 3},
+}
+# Cache alias holding the buckets so limits hold across workers; empty keeps
+# them in each process. It must be a shared, persistent cache (not DummyCache).
+RATE_LIMIT_CACHE = os.getenv('RATE_LIMIT_CACHE', '')
+
+# Rendered PDF reports, keyed by a hash of their data (whizzyverse/analytics/reports.py)
+ANALYTICS_REPORTS_DIR = BASE_DIR / 'var' / 'reports'
+ANALYTICS_REPORT_WORKERS = int(os.getenv('ANALYTICS_REPORT_WORKERS', '2'))
+
+# Seconds between recomputes of the live dashboard snapshot (whizzyverse/analytics/live.py)
+ANALYTICS_STREAM_INTERVAL = float(os.getenv('ANALYTICS_STREAM_INTERVAL', '2'))
+
 # Cache Configuration (Disable caching for development)
 CACHES = {
     'default': {
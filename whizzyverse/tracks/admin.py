@@ -4,8 +4,9 @@ from .models import Track
 
 @admin.register(Track)
 class TrackAdmin(admin.ModelAdmin):
-    list_display = ['title', 'artist', 'genre', 'bpm', 'plays', 'featured', 'created_at']
-    list_filter = ['genre', 'featured', 'created_at']
+    list_display = ['title', 'artist', 'genre', 'bpm', 'tempo', 'mood', 'plays', 'featured', 'created_at']
+    list_filter = ['genre', 'mood', 'featured', 'created_at']
     search_fields = ['title', 'artist', 'genre']
     list_editable = ['featured']
-    readonly_fields = ['plays', 'created_at', 'updated_at']
+    readonly_fields = ['plays', 'duration_seconds', 'tempo', 'energy', 'loudness', 'brightness', 'mood', 'audio_digest',
+                       'analyzed_at', 'created_at', 'updated_at']
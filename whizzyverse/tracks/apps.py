@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TracksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'whizzyverse.tracks'
+
+    def ready(self):
+        import whizzyverse.tracks.play_counter
+        import whizzyverse.tracks.signals
@@ -0,0 +1,79 @@
+"""
+Local audio file helpers shared by the waveform and analysis pipelines.
+
+Only files under ``MEDIA_ROOT`` are read, and only WAV is decoded (through the
+standard library ``wave`` module). Decoding is chunked so memory stays bounded
+by the chunk size rather than the track length. The functions here do not
+touch the database so they can run in worker processes.
+"""
+import hashlib
+import wave
+from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+import numpy as np
+
+CHUNK_FRAMES = 1 << 18
+SUPPORTED_SUFFIXES = {'.wav', '.wave'}
+
+
+def resolve_media_path(file_url, media_url, media_root):
+    """Map a track ``file_url`` to a file under ``media_root``, or None if it is not local."""
+    if not file_url:
+        return None
+    path = unquote(urlparse(file_url).path)
+    if not path.startswith(media_url):
+        return None
+    root = Path(media_root).resolve()
+    candidate = (root / path[len(media_url):]).resolve()
+    if root not in candidate.parents or not candidate.is_file():
+        return None
+    return candidate
+
+
+def is_decodable(path):
+    return path is not None and Path(path).suffix.lower() in SUPPORTED_SUFFIXES
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def wav_info(path):
+    """Return ``(sample_rate, frame_count, channels)``."""
+    with wave.open(str(path), 'rb') as wav:
+        return wav.getframerate(), wav.getnframes(), wav.getnchannels()
+
+
+def _decode(raw, sample_width, channels):
+    if sample_width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif sample_width == 2:
+        samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    elif sample_width == 3:
+        bytes_ = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = bytes_[:, 0] | (bytes_[:, 1] << 8) | (bytes_[:, 2] << 16)
+        values = np.where(values & 0x800000, values - (1 << 24), values)
+        samples = values.astype(np.float32) / float(1 << 23)
+    elif sample_width == 4:
+        samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / float(1 << 31)
+    else:
+        raise ValueError(f'Unsupported sample width: {sample_width}')
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples
+
+
+def iter_wav_chunks(path, chunk_frames=CHUNK_FRAMES):
+    """Yield mono float32 chunks in [-1, 1]."""
+    with wave.open(str(path), 'rb') as wav:
+        sample_width, channels = wav.getsampwidth(), wav.getnchannels()
+        while True:
+            raw = wav.readframes(chunk_frames)
+            if not raw:
+                break
+            yield _decode(raw, sample_width, channels)
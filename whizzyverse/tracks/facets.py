@@ -0,0 +1,185 @@
+"""
+Faceted filtering for the track catalog, shared by the API and the library page.
+
+``TrackFilters`` holds the facet selection: exact ``genre`` and ``mood``
+values (repeatable), ``bpm_min``/``bpm_max`` and ``duration_min``/
+``duration_max`` (seconds or "m:ss"). Facet counts come from a single GROUP BY
+over (genre, mood, BPM band, duration band). Range filters are applied in SQL;
+the exact ones are applied in Python to the grouped rows, so the genre counts
+ignore the selected genre (and mood likewise) and the dropdowns keep their
+options. Results are cached in-process per filter signature and catalog
+version.
+"""
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+from django.db.models import Case, CharField, Count, Value, When
+from rest_framework import filters
+
+from whizzyverse.core.catalog import catalog_version
+from whizzyverse.core.search import search_queryset
+from .models import Track, parse_duration
+
+# (name, lower bound inclusive, upper bound exclusive); matches music-filters.js.
+BPM_BANDS = [('slow', None, 100), ('medium', 100, 140), ('fast', 140, None)]
+DURATION_BANDS = [('short', None, 180), ('medium', 180, 300), ('long', 300, None)]
+
+ORDERING_ALIASES = {'duration': 'duration_seconds'}
+
+FACET_CACHE_SIZE = 256
+
+_facet_cache = OrderedDict()
+_facet_lock = threading.Lock()
+
+
+def _band_case(field, bands):
+    whens = [When(**{f'{field}__lt': upper}, then=Value(name)) for name, _, upper in bands if upper is not None]
+    whens.insert(0, When(**{f'{field}__isnull': True}, then=Value('')))
+    return Case(*whens, default=Value(bands[-1][0]), output_field=CharField())
+
+
+def _values(params, name):
+    values = []
+    for value in params.getlist(name):
+        values.extend(part.strip() for part in value.split(','))
+    return tuple(sorted({value for value in values if value}))
+
+
+def _number(params, name, parse=int):
+    value = params.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        return parse(value)
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class TrackFilters:
+    search: str = ''
+    genres: tuple = ()
+    moods: tuple = ()
+    featured: bool = False
+    bpm_min: int = None
+    bpm_max: int = None
+    duration_min: int = None
+    duration_max: int = None
+
+    @classmethod
+    def from_params(cls, params):
+        """Build from a ``QueryDict`` (``request.GET`` or ``request.query_params``)."""
+        return cls(
+            search=params.get('search', '').strip(),
+            genres=_values(params, 'genre'),
+            moods=_values(params, 'mood'),
+            featured=params.get('featured') == 'true',
+            bpm_min=_number(params, 'bpm_min'),
+            bpm_max=_number(params, 'bpm_max'),
+            duration_min=_number(params, 'duration_min', parse_duration),
+            duration_max=_number(params, 'duration_max', parse_duration),
+        )
+
+    def apply_ranges(self, queryset):
+        """Apply every filter except search, genre and mood."""
+        if self.featured:
+            queryset = queryset.filter(featured=True)
+        if self.bpm_min is not None:
+            queryset = queryset.filter(bpm__gte=self.bpm_min)
+        if self.bpm_max is not None:
+            queryset = queryset.filter(bpm__lte=self.bpm_max)
+        if self.duration_min is not None:
+            queryset = queryset.filter(duration_seconds__gte=self.duration_min)
+        if self.duration_max is not None:
+            queryset = queryset.filter(duration_seconds__lte=self.duration_max)
+        return queryset
+
+    def apply(self, queryset):
+        """Apply every filter except search, which callers rank or filter themselves."""
+        queryset = self.apply_ranges(queryset)
+        if self.genres:
+            queryset = queryset.filter(genre__in=self.genres)
+        if self.moods:
+            queryset = queryset.filter(mood__in=self.moods)
+        return queryset
+
+    def facet_counts(self):
+        key = (catalog_version(Track), self)
+        with _facet_lock:
+            if key in _facet_cache:
+                _facet_cache.move_to_end(key)
+                return _facet_cache[key]
+        counts = self._count()
+        with _facet_lock:
+            _facet_cache[key] = counts
+            while len(_facet_cache) > FACET_CACHE_SIZE:
+                _facet_cache.popitem(last=False)
+        return counts
+
+    def _count(self):
+        queryset = self.apply_ranges(Track.objects.order_by())
+        if self.search:
+            queryset = search_queryset(queryset, self.search)
+        rows = (
+            queryset.annotate(
+                bpm_band=_band_case('bpm', BPM_BANDS),
+                duration_band=_band_case('duration_seconds', DURATION_BANDS),
+            )
+            .values('genre', 'mood', 'bpm_band', 'duration_band')
+            .annotate(count=Count('id'))
+        )
+
+        genres, moods, bpm, duration = Counter(), Counter(), Counter(), Counter()
+        total = 0
+        for row in rows:
+            genre_selected = not self.genres or row['genre'] in self.genres
+            mood_selected = not self.moods or row['mood'] in self.moods
+            if mood_selected:
+                genres[row['genre']] += row['count']
+            if genre_selected and row['mood']:
+                moods[row['mood']] += row['count']
+            if genre_selected and mood_selected:
+                total += row['count']
+                bpm[row['bpm_band']] += row['count']
+                duration[row['duration_band']] += row['count']
+
+        return {
+            'total': total,
+            'genre': _value_facet(genres, self.genres),
+            'mood': _value_facet(moods, self.moods),
+            'bpm': _band_facet(bpm, BPM_BANDS),
+            'duration': _band_facet(duration, DURATION_BANDS),
+        }
+
+
+def _value_facet(counts, selected):
+    values = sorted(set(counts) | set(selected))
+    return [{'value': value, 'count': counts[value], 'selected': value in selected} for value in values]
+
+
+def _band_facet(counts, bands):
+    return [
+        {'value': name, 'min': lower, 'max': upper - 1 if upper is not None else None, 'count': counts[name]}
+        for name, lower, upper in bands
+    ]
+
+
+class TrackFacetFilter(filters.BaseFilterBackend):
+    """Apply ``TrackFilters`` query parameters to the API queryset."""
+
+    def filter_queryset(self, request, queryset, view):
+        return TrackFilters.from_params(request.query_params).apply(queryset)
+
+
+class TrackOrderingFilter(filters.OrderingFilter):
+    """``OrderingFilter`` that sorts ``duration`` by its numeric column."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        return [
+            ('-' if field.startswith('-') else '') + ORDERING_ALIASES.get(field.lstrip('-'), field.lstrip('-'))
+            for field in ordering
+        ]
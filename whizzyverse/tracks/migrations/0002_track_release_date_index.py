@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='track',
+            index=models.Index(fields=['release_date', 'id'], name='tracks_trac_release_dbdba2_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracks', '0003_track_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackWaveform',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points', models.PositiveIntegerField()),
+                ('bits', models.PositiveSmallIntegerField()),
+                ('sample_rate', models.PositiveIntegerField()),
+                ('source_digest', models.CharField(max_length=32)),
+                ('data', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('track', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waveforms', to='tracks.track')),
+            ],
+            options={
+                'ordering': ['track', 'points', 'bits'],
+                'constraints': [models.UniqueConstraint(fields=('track', 'points', 'bits'), name='unique_track_waveform')],
+            },
+        ),
+    ]
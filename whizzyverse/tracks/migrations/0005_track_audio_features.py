@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracks', '0004_trackwaveform'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='track',
+            name='analyzed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='audio_digest',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='brightness',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='energy',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='loudness',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='mood',
+            field=models.CharField(blank=True, choices=[('chill', 'Chill'), ('groovy', 'Groovy'), ('uplifting', 'Uplifting'), ('intense', 'Intense')], db_index=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='track',
+            name='tempo',
+            field=models.FloatField(blank=True, db_index=True, null=True),
+        ),
+    ]
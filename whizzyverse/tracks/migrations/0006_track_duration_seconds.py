@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+def parse_duration(value):
+    try:
+        seconds = 0
+        for part in str(value).strip().split(':'):
+            seconds = seconds * 60 + int(part)
+    except (TypeError, ValueError):
+        return None
+    return seconds if seconds >= 0 else None
+
+
+def backfill_duration_seconds(apps, schema_editor):
+    Track = apps.get_model('tracks', 'Track')
+    tracks = list(Track.objects.only('id', 'duration'))
+    for track in tracks:
+        track.duration_seconds = parse_duration(track.duration)
+    Track.objects.bulk_update(tracks, ['duration_seconds'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracks', '0005_track_audio_features'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='track',
+            name='duration_seconds',
+            field=models.PositiveIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='track',
+            name='bpm',
+            field=models.IntegerField(db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='track',
+            name='genre',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+        migrations.RunPython(backfill_duration_seconds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracks', '0006_track_duration_seconds'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('window', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day'), ('week', 'Week')], max_length=4)),
+                ('log_score', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('track', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trending_scores', to='tracks.track')),
+            ],
+            options={
+                'ordering': ['window', '-log_score'],
+                'indexes': [models.Index(fields=['window', '-log_score'], name='tracks_tren_window_39c516_idx')],
+                'constraints': [models.UniqueConstraint(fields=('track', 'window'), name='unique_trending_score')],
+            },
+        ),
+    ]
@@ -1,26 +1,121 @@
 from django.db import models
 
 
+def parse_duration(value):
+    """Parse "m:ss", "h:mm:ss" or plain seconds into seconds, or None if unparseable."""
+    try:
+        seconds = 0
+        for part in str(value).strip().split(':'):
+            seconds = seconds * 60 + int(part)
+    except (TypeError, ValueError):
+        return None
+    return seconds if seconds >= 0 else None
+
+
 class Track(models.Model):
+    MOOD_CHOICES = [
+        ('chill', 'Chill'),
+        ('groovy', 'Groovy'),
+        ('uplifting', 'Uplifting'),
+        ('intense', 'Intense'),
+    ]
+
     title = models.CharField(max_length=200)
     artist = models.CharField(max_length=200, default='DJ Whizzy')
-    genre = models.CharField(max_length=100)
-    bpm = models.IntegerField()
+    genre = models.CharField(max_length=100, db_index=True)
+    bpm = models.IntegerField(db_index=True)
     duration = models.CharField(max_length=20, default='3:30')
+    # Derived from `duration` on save, for sorting and range filters.
+    duration_seconds = models.PositiveIntegerField(blank=True, null=True, db_index=True)
     artwork = models.URLField(max_length=500, blank=True, null=True)
     file_url = models.URLField(max_length=500, blank=True, null=True)
     release_date = models.DateField(blank=True, null=True)
     plays = models.IntegerField(default=0)
     featured = models.BooleanField(default=False)
+    # Filled in by `manage.py analyze_audio` from the audio file.
+    tempo = models.FloatField(blank=True, null=True, db_index=True)
+    energy = models.FloatField(blank=True, null=True, db_index=True)
+    loudness = models.FloatField(blank=True, null=True, db_index=True)
+    brightness = models.FloatField(blank=True, null=True, db_index=True)
+    mood = models.CharField(max_length=20, choices=MOOD_CHOICES, blank=True, db_index=True)
+    audio_digest = models.CharField(max_length=32, blank=True)
+    analyzed_at = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['release_date', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.artist}"
 
+    def save(self, *args, **kwargs):
+        self.duration_seconds = parse_duration(self.duration)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'duration' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'duration_seconds'}
+        super().save(*args, **kwargs)
+
     def increment_plays(self):
+        """Count a play. The row is updated by the write-behind play counter."""
+        from .play_counter import play_counter
+        play_counter.add(self.pk)
         self.plays += 1
-        self.save()
+
+
+class TrackWaveform(models.Model):
+    """Precomputed min/max peaks for one resolution, in audiowaveform .dat format."""
+    track = models.ForeignKey(Track, on_delete=models.CASCADE, related_name='waveforms')
+    points = models.PositiveIntegerField()
+    bits = models.PositiveSmallIntegerField()
+    sample_rate = models.PositiveIntegerField()
+    source_digest = models.CharField(max_length=32)
+    data = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['track', 'points', 'bits']
+        constraints = [
+            models.UniqueConstraint(fields=['track', 'points', 'bits'], name='unique_track_waveform'),
+        ]
+
+    def __str__(self):
+        return f"{self.track} - {self.points} peaks ({self.bits}-bit)"
+
+
+class TrendingScore(models.Model):
+    """
+    Exponentially decayed play count of a track for one half-life window.
+
+    ``log_score`` is the natural log of the forward-decayed score (see
+    ``trending``); it only ever grows, and ordering by it ranks tracks by their
+    current decayed score.
+    """
+    HOUR = 'hour'
+    DAY = 'day'
+    WEEK = 'week'
+    WINDOW_CHOICES = [
+        (HOUR, 'Hour'),
+        (DAY, 'Day'),
+        (WEEK, 'Week'),
+    ]
+
+    track = models.ForeignKey(Track, on_delete=models.CASCADE, related_name='trending_scores')
+    window = models.CharField(max_length=4, choices=WINDOW_CHOICES)
+    log_score = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['window', '-log_score']
+        constraints = [
+            models.UniqueConstraint(fields=['track', 'window'], name='unique_trending_score'),
+        ]
+        indexes = [
+            models.Index(fields=['window', '-log_score']),
+        ]
+
+    def __str__(self):
+        return f"{self.track} - {self.window}"
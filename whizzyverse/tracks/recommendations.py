@@ -0,0 +1,234 @@
+"""
+Content-based track recommendations.
+
+Every track is embedded as a feature vector (BPM, genre one-hot, duration,
+log plays, release recency), scaled with statistics frozen at the last full
+build and L2-normalised, so cosine similarity is a dot product. The top-k
+neighbours of every track are computed in blocks and kept in memory; serving
+a recommendation is a dictionary lookup.
+
+Saved and deleted tracks are reported by signals and folded in incrementally:
+only the changed rows, and the rows whose neighbour lists they can affect, are
+recomputed. A full rebuild happens when the genre vocabulary changes, when a
+large share of the catalog changed, when another worker changed the catalog,
+or every ``REBUILD_INTERVAL`` seconds to refresh play counts and scaling. It
+runs outside the engine lock in the request that triggered it, and other
+requests keep getting the old neighbours until the new table is swapped in.
+"""
+import math
+import threading
+import time
+from datetime import date
+
+import numpy as np
+
+from whizzyverse.core.catalog import catalog_version
+from .models import Track
+
+NEIGHBOURS = 10
+BLOCK_SIZE = 1024
+REBUILD_INTERVAL = 3600
+REBUILD_FRACTION = 0.1
+
+GENRE_WEIGHT = 1.5
+FEATURE_COLUMNS = ['id', 'genre', 'bpm', 'duration_seconds', 'plays', 'release_date']
+
+
+class RecommendationEngine:
+    # The neighbour table, replaced as a whole by a full rebuild.
+    TABLE = ['_ids', '_rows', '_matrix', '_neighbours', '_genres', '_scaling', '_version', '_built_at']
+
+    def __init__(self, neighbours=NEIGHBOURS):
+        self.k = neighbours
+        self._lock = threading.Lock()
+        # Held for the whole of a full rebuild, so only one runs at a time.
+        self._rebuild_lock = threading.Lock()
+        self._dirty = set()
+        self._deleted = set()
+        self._reset()
+
+    def _reset(self):
+        self._ids = np.empty(0, dtype=np.int64)
+        self._rows = {}
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._neighbours = {}
+        self._genres = {}
+        self._scaling = None
+        self._version = None
+        self._built_at = 0.0
+
+    def mark_dirty(self, track_id):
+        with self._lock:
+            self._dirty.add(track_id)
+            self._deleted.discard(track_id)
+
+    def mark_deleted(self, track_id):
+        with self._lock:
+            self._deleted.add(track_id)
+            self._dirty.discard(track_id)
+
+    def recommend(self, track_id, limit=None):
+        """Return up to ``limit`` track ids most similar to ``track_id``."""
+        with self._lock:
+            rebuild = self._refresh()
+        if rebuild:
+            self._rebuild()
+        elif self._version is None:
+            # The first build is running in another request; wait for it.
+            with self._rebuild_lock:
+                pass
+        with self._lock:
+            return list(self._neighbours.get(track_id, ())[:limit or self.k])
+
+    def _refresh(self):
+        """Fold pending changes in. Returns True if the caller must run a full rebuild."""
+        if self._rebuild_lock.locked():
+            # Changes made meanwhile are applied to the new table afterwards.
+            return False
+        stale = time.monotonic() - self._built_at > REBUILD_INTERVAL
+        if self._version is None or stale:
+            return self._claim_rebuild()
+        if self._dirty or self._deleted:
+            changed = len(self._dirty) + len(self._deleted)
+            if changed > REBUILD_FRACTION * max(len(self._ids), 1) or not self._update():
+                return self._claim_rebuild()
+            self._version = catalog_version(Track)
+        elif catalog_version(Track) != self._version:
+            # Changed by another worker; we don't know which rows.
+            return self._claim_rebuild()
+        return False
+
+    def _claim_rebuild(self):
+        if not self._rebuild_lock.acquire(blocking=False):
+            return False
+        # The rebuild reads every row after this point.
+        self._dirty.clear()
+        self._deleted.clear()
+        return True
+
+    def _raw_features(self, rows):
+        today = date.today()
+        bpm = np.array([row['bpm'] or 0 for row in rows], dtype=np.float64)
+        duration = np.array([row['duration_seconds'] or 0 for row in rows], dtype=np.float64)
+        plays = np.log1p(np.array([max(row['plays'] or 0, 0) for row in rows], dtype=np.float64))
+        age = np.array(
+            [(today - row['release_date']).days if row['release_date'] else np.nan for row in rows],
+            dtype=np.float64,
+        )
+        recency = np.exp(-np.maximum(age, 0) / 365.0)
+        return np.column_stack([bpm, duration, plays, recency])
+
+    def _embed(self, rows):
+        numeric = self._raw_features(rows)
+        mean, std = self._scaling
+        numeric = np.where(np.isnan(numeric), mean, numeric)
+        numeric = (numeric - mean) / std
+        genres = np.zeros((len(rows), len(self._genres)), dtype=np.float64)
+        for i, row in enumerate(rows):
+            genres[i, self._genres[row['genre']]] = GENRE_WEIGHT
+        vectors = np.hstack([numeric, genres])
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return (vectors / np.where(norms == 0, 1, norms)).astype(np.float32)
+
+    def _rebuild(self):
+        """Build a new table without holding the engine lock, then swap it in."""
+        try:
+            fresh = RecommendationEngine(self.k)
+            fresh._build()
+            with self._lock:
+                for name in self.TABLE:
+                    setattr(self, name, getattr(fresh, name))
+        finally:
+            self._rebuild_lock.release()
+
+    def _build(self):
+        version = catalog_version(Track)
+        rows = list(Track.objects.order_by('id').values(*FEATURE_COLUMNS))
+        self._version = version
+        self._built_at = time.monotonic()
+        if not rows:
+            return
+        self._genres = {genre: i for i, genre in enumerate(sorted({row['genre'] for row in rows}))}
+        numeric = self._raw_features(rows)
+        mean = np.nanmean(numeric, axis=0)
+        mean = np.where(np.isnan(mean), 0, mean)
+        std = np.nanstd(numeric, axis=0)
+        self._scaling = (mean, np.where((std == 0) | np.isnan(std), 1, std))
+        self._ids = np.array([row['id'] for row in rows], dtype=np.int64)
+        self._rows = {pk: i for i, pk in enumerate(self._ids.tolist())}
+        self._matrix = self._embed(rows)
+        self._compute_rows(np.arange(len(rows)))
+
+    def _compute_rows(self, rows):
+        """Recompute the neighbour lists of the given matrix rows, in blocks."""
+        n = len(self._ids)
+        k = min(self.k, n - 1)
+        for start in range(0, len(rows), BLOCK_SIZE):
+            block = rows[start:start + BLOCK_SIZE]
+            scores = self._matrix[block] @ self._matrix.T
+            scores[np.arange(len(block)), block] = -np.inf
+            if k <= 0:
+                for row in block:
+                    self._neighbours[int(self._ids[row])] = []
+                continue
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            for row, neighbours in zip(block, top):
+                self._neighbours[int(self._ids[row])] = self._ids[neighbours].tolist()
+
+    def _update(self):
+        """Fold pending changes in. Returns False if a full rebuild is needed."""
+        dirty, deleted = set(self._dirty), set(self._deleted)
+        self._dirty.clear()
+        self._deleted.clear()
+        rows = list(Track.objects.filter(pk__in=dirty).values(*FEATURE_COLUMNS))
+        if any(row['genre'] not in self._genres for row in rows) or self._scaling is None:
+            return False
+        deleted |= dirty - {row['id'] for row in rows}
+
+        keep = np.array([pk not in deleted for pk in self._ids.tolist()], dtype=bool)
+        self._ids, self._matrix = self._ids[keep], self._matrix[keep]
+        for pk in deleted:
+            self._neighbours.pop(pk, None)
+
+        vectors = self._embed(rows) if rows else np.empty((0, self._matrix.shape[1]), dtype=np.float32)
+        self._rows = {pk: i for i, pk in enumerate(self._ids.tolist())}
+        new_rows = []
+        for row, vector in zip(rows, vectors):
+            index = self._rows.get(row['id'])
+            if index is None:
+                self._ids = np.append(self._ids, row['id'])
+                self._matrix = np.vstack([self._matrix, vector[None, :]])
+                index = len(self._ids) - 1
+                self._rows[row['id']] = index
+            else:
+                self._matrix[index] = vector
+            new_rows.append(index)
+
+        changed = dirty | deleted
+        affected = set(new_rows)
+        if new_rows:
+            # Rows that could gain a changed track as a neighbour.
+            scores = self._matrix @ self._matrix[new_rows].T
+            best = scores.max(axis=1)
+            for pk, index in self._rows.items():
+                neighbours = self._neighbours.get(pk, [])
+                if len(neighbours) < self.k or best[index] > self._score(index, neighbours[-1]):
+                    affected.add(index)
+        for pk, index in self._rows.items():
+            if changed.intersection(self._neighbours.get(pk, ())):
+                affected.add(index)
+        if affected:
+            self._compute_rows(np.array(sorted(affected)))
+        return True
+
+    def _score(self, index, other_id):
+        other = self._rows.get(other_id)
+        if other is None:
+            return -math.inf
+        return float(self._matrix[index] @ self._matrix[other])
+
+
+recommender = RecommendationEngine()
@@ -5,6 +5,7 @@ from .models import Track
 class TrackSerializer(serializers.ModelSerializer):
     class Meta:
         model = Track
-        fields = ['id', 'title', 'artist', 'genre', 'bpm', 'duration', 'artwork', 
-                  'file_url', 'release_date', 'plays', 'featured', 'created_at']
-        read_only_fields = ['plays', 'created_at']
+        fields = ['id', 'title', 'artist', 'genre', 'bpm', 'duration', 'duration_seconds', 'artwork', 
+                  'file_url', 'release_date', 'plays', 'featured', 'tempo', 'energy',
+                  'loudness', 'brightness', 'mood', 'created_at']
+        read_only_fields = ['plays', 'duration_seconds', 'tempo', 'energy', 'loudness', 'brightness', 'mood', 'created_at']
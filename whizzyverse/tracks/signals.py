@@ -0,0 +1,40 @@
+import logging
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .models import Track
+
+logger = logging.getLogger(__name__)
+
+# Sent after buffered plays are written. ``counts`` maps track pk to plays added.
+plays_flushed = Signal()
+
+
+@receiver(post_save, sender=Track)
+def refresh_recommendations_on_save(sender, instance, **kwargs):
+    from .recommendations import recommender
+    recommender.mark_dirty(instance.pk)
+
+
+@receiver(post_delete, sender=Track)
+def refresh_recommendations_on_delete(sender, instance, **kwargs):
+    from .recommendations import recommender
+    recommender.mark_deleted(instance.pk)
+
+
+@receiver(post_save, sender=Track)
+@receiver(post_delete, sender=Track)
+def invalidate_catalog_snapshot(sender, **kwargs):
+    from .snapshot import catalog_snapshot
+    catalog_snapshot.invalidate()
+
+
+@receiver(plays_flushed)
+def update_trending_scores(sender, counts, **kwargs):
+    from .trending import record_plays
+    # The plays are already committed; a trending failure must not fail the flush.
+    try:
+        record_plays(counts)
+    except Exception:
+        logger.exception('Updating trending scores failed')
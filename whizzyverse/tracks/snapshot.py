@@ -0,0 +1,80 @@
+"""
+Prebuilt catalog snapshot for client-side filtering.
+
+The whole track list is serialized once per catalog and play-count version
+into compact JSON and stored alongside its gzip encoding, with a strong ETag
+derived from the content. Requests are answered from memory; repeat clients
+get a 304.
+"""
+import gzip
+import hashlib
+import json
+import re
+import threading
+from dataclasses import dataclass
+
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+
+from whizzyverse.core.catalog import PLAYS_STAMP, catalog_version
+from .models import Track
+from .serializers import TrackSerializer
+
+ACCEPTS_GZIP_RE = re.compile(r'\bgzip\b')
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    version: tuple
+    etag: str
+    body: bytes
+    gzipped: bytes
+
+
+class CatalogSnapshot:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = None
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+
+    def get(self):
+        # Plays are flushed without touching updated_at and have their own stamp.
+        version = (catalog_version(Track), catalog_version(PLAYS_STAMP))
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = self._build(version)
+            return self._snapshot
+
+    def _build(self, version):
+        tracks = TrackSerializer(Track.objects.order_by('-release_date', '-id'), many=True).data
+        digest = hashlib.sha256(json.dumps(tracks, separators=(',', ':')).encode()).hexdigest()[:32]
+        body = json.dumps({'version': digest, 'tracks': tracks}, separators=(',', ':')).encode()
+        return Snapshot(version, digest, body, gzip.compress(body, compresslevel=9, mtime=0))
+
+    def response(self, request):
+        snapshot = self.get()
+        use_gzip = bool(ACCEPTS_GZIP_RE.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+        etag = f'"{snapshot.etag}-gzip"' if use_gzip else f'"{snapshot.etag}"'
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+        client_tags = {tag.strip().removeprefix('W/').strip('"') for tag in if_none_match.split(',')}
+        if snapshot.etag in client_tags or f'{snapshot.etag}-gzip' in client_tags or '*' in client_tags:
+            response = HttpResponseNotModified()
+        elif use_gzip:
+            response = HttpResponse(snapshot.gzipped, content_type='application/json')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(snapshot.body, content_type='application/json')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, no-cache'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+
+catalog_snapshot = CatalogSnapshot()
@@ -0,0 +1,116 @@
+"""
+Trending tracks ranked by exponentially decayed play counts.
+
+Scores use forward decay: a play at time ``t`` adds ``exp(λ(t - EPOCH))`` to a
+track's score for each half-life window, where ``λ = ln 2 / half_life``. The
+current decayed score is the stored score times ``exp(-λ(now - EPOCH))``, the
+same factor for every track, so stored scores never need rewriting as time
+passes and ordering by them is ordering by the decayed score. They are kept as
+logarithms (``TrendingScore.log_score``) so they cannot overflow.
+
+Flushed plays (the ``plays_flushed`` signal) are folded into the table with one
+UPDATE per window and distinct play count. Each process keeps the top
+``TOP_K`` rows per window, serialized, for ``REFRESH_SECONDS``, so a trending
+request reads at most ``TOP_K`` entries from memory.
+"""
+import math
+import threading
+import time
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+
+from .models import Track, TrendingScore
+from .serializers import TrackSerializer
+
+HALF_LIVES = {
+    TrendingScore.HOUR: 3600,
+    TrendingScore.DAY: 86400,
+    TrendingScore.WEEK: 7 * 86400,
+}
+# Landmark for forward decay (2024-01-01T00:00:00Z).
+EPOCH = 1704067200
+# Placeholder log score of a row created before its first update; exp() of it is zero.
+EMPTY_LOG_SCORE = -1e9
+
+TOP_K = 50
+REFRESH_SECONDS = 10
+UPDATE_CHUNK_SIZE = 500
+
+
+def decay_rate(window):
+    return math.log(2) / HALF_LIVES[window]
+
+
+def record_plays(counts, now=None):
+    """Add ``counts`` (track pk -> plays) at time ``now`` to every window."""
+    now = time.time() if now is None else now
+    track_ids = list(Track.objects.filter(pk__in=list(counts)).values_list('pk', flat=True))
+    by_count = defaultdict(list)
+    for track_id in track_ids:
+        by_count[counts[track_id]].append(track_id)
+
+    with transaction.atomic():
+        TrendingScore.objects.bulk_create(
+            [
+                TrendingScore(track_id=track_id, window=window, log_score=EMPTY_LOG_SCORE)
+                for window in HALF_LIVES for track_id in track_ids
+            ],
+            batch_size=UPDATE_CHUNK_SIZE,
+            ignore_conflicts=True,
+        )
+        for window in HALF_LIVES:
+            offset = decay_rate(window) * (now - EPOCH)
+            for count, ids in by_count.items():
+                # log(exp(a) + exp(b)) = max(a, b) + log(1 + exp(-|a - b|))
+                added = Value(offset + math.log(count))
+                merged = Greatest(F('log_score'), added) + Ln(1 + Exp(-Abs(F('log_score') - added)))
+                for start in range(0, len(ids), UPDATE_CHUNK_SIZE):
+                    chunk = ids[start:start + UPDATE_CHUNK_SIZE]
+                    TrendingScore.objects.filter(window=window, track_id__in=chunk).update(log_score=merged)
+    trending_board.invalidate()
+
+
+class TrendingBoard:
+    def __init__(self, size=TOP_K):
+        self.size = size
+        self._lock = threading.Lock()
+        self._boards = {}
+
+    def invalidate(self):
+        with self._lock:
+            self._boards.clear()
+
+    def _board(self, window):
+        now = time.monotonic()
+        board = self._boards.get(window)
+        if board is not None and board[0] > now:
+            return board[1]
+        with self._lock:
+            board = self._boards.get(window)
+            if board is None or board[0] <= now:
+                board = (now + REFRESH_SECONDS, self._build(window))
+                self._boards[window] = board
+            return board[1]
+
+    def _build(self, window):
+        rows = list(
+            TrendingScore.objects.filter(window=window, log_score__gt=EMPTY_LOG_SCORE)
+            .select_related('track').order_by('-log_score')[:self.size]
+        )
+        tracks = TrackSerializer([row.track for row in rows], many=True).data
+        return [(row.log_score, track) for row, track in zip(rows, tracks)]
+
+    def top(self, window, limit):
+        """The ``limit`` highest-scoring tracks with their current decayed scores."""
+        offset = decay_rate(window) * (time.time() - EPOCH)
+        return [
+            {**track, 'trending_score': round(math.exp(log_score - offset), 3)}
+            for log_score, track in self._board(window)[:limit]
+        ]
+
+
+trending_board = TrendingBoard()
+
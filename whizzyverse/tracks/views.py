@@ -1,85 +1,163 @@
+from django.http import HttpResponse
 from django.shortcuts import render
-from django.db.models import Q
-from django.core.serializers import serialize
+from django.utils.cache import get_conditional_response
 import json
-from rest_framework import viewsets, filters
+from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Track
+from whizzyverse.analytics.events import record_event
+from whizzyverse.analytics.models import AnalyticsEvent
+from whizzyverse.analytics.uniques import record_listener
+from whizzyverse.core.conditional import ConditionalGetMixin
+from whizzyverse.core.pagination import InvalidCursor, paginate_keyset
+from whizzyverse.core.search import FullTextSearchFilter, search_queryset
+from whizzyverse.core.throttling import TokenBucketThrottle
+from .facets import TrackFacetFilter, TrackFilters, TrackOrderingFilter
+from .models import Track, TrackWaveform, TrendingScore
+from .recommendations import recommender
 from .serializers import TrackSerializer
+from .snapshot import catalog_snapshot
+from .trending import HALF_LIVES, TOP_K, trending_board
 
+LIBRARY_PAGE_SIZE = 24
 
-class TrackViewSet(viewsets.ReadOnlyModelViewSet):
+# Columns needed by the library cards and the player.
+LIBRARY_FIELDS = ['id', 'title', 'artist', 'genre', 'bpm', 'duration', 'artwork', 'file_url', 'plays']
+
+# Library sort options mapped to the column they are paginated on.
+LIBRARY_SORTS = {
+    'title': 'title', '-title': '-title',
+    'release_date': 'release_date', '-release_date': '-release_date',
+    'plays': 'plays', '-plays': '-plays',
+    'bpm': 'bpm', '-bpm': '-bpm',
+    'duration': 'duration_seconds', '-duration': '-duration_seconds',
+}
+
+
+class PlayThrottle(TokenBucketThrottle):
+    scope = 'play'
+
+
+class TrackViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Track.objects.all()
     serializer_class = TrackSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['title', 'genre', 'description']
-    ordering_fields = ['title', 'release_date', 'plays', 'duration']
+    filter_backends = [TrackFacetFilter, TrackOrderingFilter, FullTextSearchFilter]
+    search_fields = ['title', 'artist', 'genre']
+    ordering_fields = ['title', 'release_date', 'plays', 'bpm', 'duration']
     ordering = ['-release_date']
-    
-    def get_queryset(self):
-        queryset = Track.objects.all()
-        genre = self.request.query_params.get('genre', None)
-        featured = self.request.query_params.get('featured', None)
-        
-        if genre:
-            queryset = queryset.filter(genre__icontains=genre)
-        if featured == 'true':
-            queryset = queryset.filter(featured=True)
-        
-        return queryset
-    
-    @action(detail=True, methods=['post'])
+
+    @action(detail=False, methods=['get'])
+    def facets(self, request):
+        return Response(TrackFilters.from_params(request.query_params).facet_counts())
+
+    @action(detail=False, methods=['get'])
+    def trending(self, request):
+        window = request.query_params.get('window', TrendingScore.DAY)
+        if window not in HALF_LIVES:
+            return Response({'error': 'window must be one of: ' + ', '.join(HALF_LIVES)}, status=400)
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), TOP_K)
+        except ValueError:
+            limit = 10
+        return Response({
+            'window': window,
+            'half_life': HALF_LIVES[window],
+            'tracks': trending_board.top(window, limit),
+        })
+
+    @action(detail=False, methods=['get'], url_path='all')
+    def all_tracks(self, request):
+        return catalog_snapshot.response(request)
+
+    @action(detail=True, methods=['post'], throttle_classes=[PlayThrottle])
     def play(self, request, pk=None):
         track = self.get_object()
         track.increment_plays()
+        record_event(AnalyticsEvent.PLAY, track_id=track.pk, genre=track.genre)
+        record_listener(track.pk, request)
         return Response({'status': 'play counted', 'plays': track.plays})
 
+    @action(detail=True, methods=['get'])
+    def peaks(self, request, pk=None):
+        try:
+            points = int(request.query_params.get('points', 1024))
+        except ValueError:
+            points = 1024
+        bits = 16 if request.query_params.get('bits') == '16' else 8
+
+        waveforms = TrackWaveform.objects.filter(track_id=pk, bits=bits)
+        waveform = (
+            waveforms.filter(points__gte=points).order_by('points').values('id', 'points', 'source_digest').first()
+            or waveforms.order_by('-points').values('id', 'points', 'source_digest').first()
+        )
+        if waveform is None:
+            return Response({'detail': 'No waveform peaks for this track.'}, status=404)
+
+        etag = f'"{waveform["source_digest"]}-{waveform["points"]}-{bits}"'
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            data = TrackWaveform.objects.values_list('data', flat=True).get(pk=waveform['id'])
+            response = HttpResponse(bytes(data), content_type='application/octet-stream')
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, max-age=86400, stale-while-revalidate=604800'
+        return response
+
+    @action(detail=True, methods=['get'])
+    def recommendations(self, request, pk=None):
+        track = self.get_object()
+        try:
+            limit = min(max(int(request.query_params.get('limit', 6)), 1), recommender.k)
+        except ValueError:
+            limit = 6
+        track_ids = recommender.recommend(track.pk, limit)
+        tracks = Track.objects.in_bulk(track_ids)
+        serializer = self.get_serializer([tracks[pk] for pk in track_ids if pk in tracks], many=True)
+        return Response({'recommendations': serializer.data})
+
 
 def music_library_view(request):
-    tracks = Track.objects.all()
-    
-    search_query = request.GET.get('search', '')
-    genre_filter = request.GET.get('genre', '')
+    track_filters = TrackFilters.from_params(request.GET)
+    tracks = track_filters.apply(Track.objects.all())
+    if track_filters.search:
+        tracks = search_queryset(tracks, track_filters.search)
+
     sort_by = request.GET.get('sort', '-release_date')
-    
-    if search_query:
-        tracks = tracks.filter(
-            Q(title__icontains=search_query) |
-            Q(genre__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
-    
-    if genre_filter:
-        tracks = tracks.filter(genre__icontains=genre_filter)
-    
-    allowed_sort_fields = ['title', '-title', 'release_date', '-release_date', 'plays', '-plays', 'duration', '-duration']
-    if sort_by and sort_by in allowed_sort_fields:
-        tracks = tracks.order_by(sort_by)
-    else:
-        tracks = tracks.order_by('-release_date')
-    
+    if sort_by not in LIBRARY_SORTS:
+        sort_by = '-release_date'
+
+    cursor = request.GET.get('cursor', '')
+    sort_field = LIBRARY_SORTS[sort_by]
+    try:
+        page = paginate_keyset(tracks, sort_field, LIBRARY_FIELDS, cursor=cursor, page_size=LIBRARY_PAGE_SIZE)
+    except InvalidCursor:
+        cursor = ''
+        page = paginate_keyset(tracks, sort_field, LIBRARY_FIELDS, page_size=LIBRARY_PAGE_SIZE)
+
+    params = request.GET.copy()
+    params.pop('cursor', None)
+    first_page_url = f'?{params.urlencode()}'
+    next_page_url = None
+    if page.has_next:
+        params['cursor'] = page.next_cursor
+        next_page_url = f'?{params.urlencode()}'
+
     featured_tracks = Track.objects.filter(featured=True)[:3]
-    all_genres = Track.objects.values_list('genre', flat=True).distinct()
-    
-    tracks_json = json.dumps([{
-        'id': t.id,
-        'title': t.title,
-        'artist': t.artist,
-        'genre': t.genre,
-        'bpm': t.bpm,
-        'artwork': t.artwork,
-        'file_url': t.file_url if hasattr(t, 'file_url') else '',
-        'duration': t.duration,
-        'plays': float(t.plays)
-    } for t in tracks])
-    
+    facets = track_filters.facet_counts()
+
+    tracks_json = json.dumps([{field: track[field] for field in LIBRARY_FIELDS} for track in page.items])
+
     return render(request, 'tracks/music_library.html', {
-        'tracks': tracks,
+        'tracks': page.items,
         'tracks_json': tracks_json,
         'featured_tracks': featured_tracks,
-        'all_genres': all_genres,
-        'search_query': search_query,
-        'genre_filter': genre_filter,
+        'facets': facets,
+        'search_query': track_filters.search,
+        'bpm_min': request.GET.get('bpm_min', ''),
+        'bpm_max': request.GET.get('bpm_max', ''),
+        'duration_min': request.GET.get('duration_min', ''),
+        'duration_max': request.GET.get('duration_max', ''),
         'sort_by': sort_by,
+        'is_first_page': not cursor,
+        'first_page_url': first_page_url,
+        'next_page_url': next_page_url,
     })
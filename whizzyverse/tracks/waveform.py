@@ -0,0 +1,90 @@
+"""
+Waveform peaks for the player.
+
+Peaks are min/max sample pairs per pixel column, computed server-side at a few
+fixed resolutions and stored in the audiowaveform ``.dat`` (version 1) binary
+layout, which is little-endian::
+
+    int32 version, uint32 flags (bit 0: 8-bit samples), int32 sample_rate,
+    int32 samples_per_pixel, uint32 length, then ``length`` (min, max) pairs
+
+as int8 or int16. Functions here are database-free so the management command
+can run them in a process pool.
+"""
+import math
+import struct
+
+import numpy as np
+
+from .audio import file_digest, iter_wav_chunks, wav_info
+
+PEAK_RESOLUTIONS = (256, 1024, 4096)
+PEAK_BITS = (8, 16)
+HEADER = struct.Struct('<iIiiI')
+
+
+def compute_peaks(path, resolutions=PEAK_RESOLUTIONS):
+    """
+    Return ``(sample_rate, frame_count, {points: (mins, maxs)})`` as float32 arrays.
+
+    The finest resolution is computed in one streaming pass; coarser ones are
+    folded from it, so every resolution must divide the largest.
+    """
+    sample_rate, frames, _ = wav_info(path)
+    finest = max(resolutions)
+    mins = np.full(finest, np.inf, dtype=np.float32)
+    maxs = np.full(finest, -np.inf, dtype=np.float32)
+
+    offset = 0
+    for chunk in iter_wav_chunks(path):
+        positions = np.arange(offset, offset + len(chunk), dtype=np.int64)
+        buckets = positions * finest // max(frames, 1)
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ids = buckets[starts]
+        np.minimum.at(mins, ids, np.minimum.reduceat(chunk, starts))
+        np.maximum.at(maxs, ids, np.maximum.reduceat(chunk, starts))
+        offset += len(chunk)
+
+    empty = np.isinf(mins)
+    mins[empty] = 0
+    maxs[empty] = 0
+
+    peaks = {}
+    for points in resolutions:
+        factor = finest // points
+        peaks[points] = (mins.reshape(points, factor).min(axis=1), maxs.reshape(points, factor).max(axis=1))
+    return sample_rate, frames, peaks
+
+
+def encode_peaks(mins, maxs, bits, sample_rate, frames):
+    """Quantize a resolution to int8/int16 and pack it as a ``.dat`` document."""
+    scale, dtype = (127, '<i1') if bits == 8 else (32767, '<i2')
+    pairs = np.empty(len(mins) * 2, dtype=dtype)
+    pairs[0::2] = np.clip(np.round(mins * scale), -scale - 1, scale)
+    pairs[1::2] = np.clip(np.round(maxs * scale), -scale - 1, scale)
+    samples_per_pixel = max(1, math.ceil(frames / max(len(mins), 1)))
+    header = HEADER.pack(1, 1 if bits == 8 else 0, sample_rate, samples_per_pixel, len(mins))
+    return header + pairs.tobytes()
+
+
+def build_waveforms(path, known_digest=None):
+    """
+    Process-pool entry point for one audio file.
+
+    Returns ``{'digest': ..., 'waveforms': [...]}`` or, if the file's digest
+    equals ``known_digest``, ``{'digest': ..., 'skipped': True}``.
+    """
+    digest = file_digest(path)
+    if digest == known_digest:
+        return {'digest': digest, 'skipped': True}
+    sample_rate, frames, peaks = compute_peaks(path)
+    waveforms = []
+    for points, (mins, maxs) in peaks.items():
+        for bits in PEAK_BITS:
+            waveforms.append({
+                'points': points,
+                'bits': bits,
+                'sample_rate': sample_rate,
+                'data': encode_peaks(mins, maxs, bits, sample_rate, frames),
+            })
+    return {'digest': digest, 'waveforms': waveforms}
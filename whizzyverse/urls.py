@@ -1,15 +1,15 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework import routers
 
-from whizzyverse.core.views import landing_page_view, favorites_view
+from whizzyverse.core.views import landing_page_view, favorites_view, media_stream_view
 from whizzyverse.tracks.views import TrackViewSet, music_library_view
 from whizzyverse.events.views import EventViewSet, events_view
 from whizzyverse.merch.views import MerchItemViewSet, merch_store_view
-from whizzyverse.analytics.views import AnalyticsViewSet, analytics_summary, admin_dashboard_view
-from whizzyverse.ai_connector.views import chat_with_whizbot
+from whizzyverse.analytics.views import AnalyticsViewSet, analytics_stream, analytics_summary, analytics_trends, analytics_uniques, admin_dashboard_view
+from whizzyverse.ai_connector.views import chat_stream, chat_with_whizbot
 from whizzyverse.newsletter.views import NewsletterSubscriberViewSet
 from whizzyverse.contact.views import ContactMessageViewSet
 
@@ -29,11 +29,17 @@ urlpatterns = [
     path('merch/', merch_store_view, name='merch_store'),
     path('favorites/', favorites_view, name='favorites'),
     path('admin-demo/', admin_dashboard_view, name='admin_dashboard'),
+    path('analytics/', include('whizzyverse.analytics.urls')),
+    # Listed before the router so `analytics/<pk>/` does not swallow them.
+    path('api/analytics/summary/', analytics_summary, name='analytics_summary'),
+    path('api/analytics/trends/', analytics_trends, name='analytics_trends'),
+    path('api/analytics/uniques/', analytics_uniques, name='analytics_uniques'),
+    path('api/analytics/stream/', analytics_stream, name='analytics_stream'),
     path('api/', include(router.urls)),
     path('api/chat/', chat_with_whizbot, name='chat_whizbot'),
-    path('api/analytics/summary/', analytics_summary, name='analytics_summary'),
+    path('api/chat/stream/', chat_stream, name='chat_stream'),
+    re_path(r'^%s(?P<path>.+)$' % settings.MEDIA_URL.lstrip('/'), media_stream_view, name='media_stream'),
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)